@@ -3,15 +3,31 @@
 # ============================================================
 
 import streamlit as st
-import pandas as pd
-import json
-from datetime import datetime, timedelta, date
-from pymongo import MongoClient
-from dotenv import load_dotenv
-import os
-from joblib import load
-import math
+from datetime import datetime, date, timezone
 import calendar
+from functools import partial
+
+from resources import (
+    get_memo,
+    get_mongo,
+    get_predictor,
+    get_saved,
+    get_slot_log,
+    get_writer,
+    model_available,
+    model_version,
+)
+from scheduler import FamilyEvent, Routine, ScheduleRequest, Subject
+from scheduler.codec import decode, encode
+from scheduler.export import to_bytes
+from scheduler.incremental import IncrementalScheduler
+from scheduler.keys import request_key
+
+
+def parquet_bytes(tt):
+    # pyarrow takes ~0.8 s to import: only pay for it on a Parquet download
+    from scheduler.arrow import to_bytes
+    return to_bytes(tt)
 
 # ============================================================
 # PAGE CONFIG (must be first)
@@ -233,31 +249,11 @@ label, .stSlider label, .stSelectbox label,
 """, unsafe_allow_html=True)
 
 # ============================================================
-# ML MODEL
-# ============================================================
-model = None
-try:
-    model = load("model.joblib")
-except:
-    pass
-
-# ============================================================
-# DATABASE
+# RESOURCES (model + Mongo: created once per process, lazily)
 # ============================================================
-load_dotenv()
-MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
-DB_NAME   = os.getenv("DB_NAME", "timetable_app")
-
-mongo_ok = False
-try:
-    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=4000)
-    client.server_info()
-    db = client[DB_NAME]
-    users_collection     = db["users"]
-    timetable_collection = db["timetables"]
-    mongo_ok = True
-except Exception as e:
-    st.error(f"⚠️ Mongo Error → {e}")
+mongo = get_mongo()
+if mongo.status() is False:
+    st.error(f"⚠️ Mongo Error → {mongo.error}")
 
 # ============================================================
 # SESSION STATE
@@ -318,89 +314,102 @@ st.markdown('<div class="section-card">', unsafe_allow_html=True)
 st.markdown('<div class="section-title"><span>👨‍👩‍👧</span> Family Events Calendar</div>', unsafe_allow_html=True)
 st.markdown("**Pick dates with family events — timetable will adjust study hours automatically.**")
 
-# Month navigation
-today      = date.today()
-base_first = date(today.year, today.month, 1)
-
-nav1, nav2, nav3 = st.columns([1, 4, 1])
-with nav1:
-    if st.button("◀ Prev", key="cal_prev"):
-        if st.session_state.cal_offset > 0:
-            st.session_state.cal_offset -= 1
-        st.rerun()
-with nav3:
-    if st.button("Next ▶", key="cal_next"):
-        st.session_state.cal_offset += 1
-        st.rerun()
-
-# Compute displayed month
-off         = st.session_state.cal_offset
-raw_month   = base_first.month - 1 + off
-disp_year   = base_first.year + raw_month // 12
-disp_month  = raw_month % 12 + 1
-disp_first  = date(disp_year, disp_month, 1)
-_, days_in  = calendar.monthrange(disp_year, disp_month)
-start_wd    = disp_first.weekday()   # 0=Mon
-
-with nav2:
-    st.markdown(
-        f"<div style='text-align:center;font-size:1.15rem;font-weight:800;padding:6px 0;'>"
-        f"📅 {disp_first.strftime('%B %Y')}</div>",
-        unsafe_allow_html=True
-    )
+DAY_LABELS_HTML = "".join(f'<div class="cal-day-label">{d}</div>'
+                          for d in ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"])
+STUDY_REDUCTION_LABEL = {"low": "~20% less study", "medium": "~40% less study", "high": "~70% less study"}
+IMPACT_EMOJI          = {"low": "🟢 Low", "medium": "🟡 Medium", "high": "🔴 High"}
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def month_view(disp_year, disp_month, selected, today):
+    """(title, grid HTML, pickable future dates) for one month; `selected`
+    holds that month's event dates, so the key only changes with them."""
+    disp_first = date(disp_year, disp_month, 1)
+    _, days_in = calendar.monthrange(disp_year, disp_month)
+    cells  = ["<div class='cal-day empty'></div>"] * disp_first.weekday()   # 0=Mon
+    future = []
+    for dn in range(1, days_in + 1):
+        d   = disp_first.replace(day=dn)
+        cls = "cal-day"
+        if str(d) in selected: cls += " selected"
+        elif d == today:       cls += " today"
+        elif d < today:        cls += " past"
+        cells.append(f"<div class='{cls}'>{dn}</div>")
+        if d >= today:
+            future.append(d)
+    title = (f"<div style='text-align:center;font-size:1.15rem;font-weight:800;padding:6px 0;'>"
+             f"📅 {disp_first.strftime('%B %Y')}</div>")
+    return title, f"<div class='cal-grid'>{DAY_LABELS_HTML}{''.join(cells)}</div>", future
+
+
+# The calendar and the event list rerun on their own (st.fragment): paging
+# months or moving an event slider re-executes only that block, not the
+# page with its model / Mongo setup. Adding or removing an event changes
+# both blocks, so those rerun the whole app.
+def shift_month(step):
+    st.session_state.cal_offset = max(0, st.session_state.cal_offset + step)
+
+
+@st.fragment
+def family_calendar():
+    today      = date.today()
+    base_first = date(today.year, today.month, 1)
+
+    # Month navigation (callbacks run before the fragment redraws)
+    nav1, nav2, nav3 = st.columns([1, 4, 1])
+    with nav1:
+        st.button("◀ Prev", key="cal_prev", on_click=shift_month, args=(-1,))
+    with nav3:
+        st.button("Next ▶", key="cal_next", on_click=shift_month, args=(1,))
+
+    # Compute displayed month
+    raw_month  = base_first.month - 1 + st.session_state.cal_offset
+    disp_year  = base_first.year + raw_month // 12
+    disp_month = raw_month % 12 + 1
+    prefix     = f"{disp_year:04d}-{disp_month:02d}-"
+    selected   = tuple(sorted(ds for ds in st.session_state.family_events if ds.startswith(prefix)))
+    title, grid, future_days = month_view(disp_year, disp_month, selected, today)
+
+    with nav2:
+        st.markdown(title, unsafe_allow_html=True)
+
+    # calendar HTML (visual only)
+    st.markdown(grid, unsafe_allow_html=True)
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # Date picker + Add button
+    if future_days:
+        pick_col, add_col = st.columns([4, 1])
+        with pick_col:
+            picked = st.selectbox(
+                "📆 Select a date to add as Family Event",
+                options=future_days,
+                format_func=lambda d: d.strftime("%A, %d %B %Y"),
+                key="date_picker"
+            )
+        with add_col:
+            st.markdown("<br>", unsafe_allow_html=True)
+            if st.button("➕ Add", key="add_event_btn"):
+                ds = str(picked)
+                if ds not in st.session_state.family_events:
+                    st.session_state.family_events[ds] = {"impact": "medium", "hours": 3}
+                st.rerun()
+    else:
+        st.info("No future dates in this month — go to next month.")
 
-# Build calendar HTML (visual only)
-day_labels = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
-label_html = "".join(f'<div class="cal-day-label">{d}</div>' for d in day_labels)
-
-cells = ["<div class='cal-day empty'></div>"] * start_wd
-for dn in range(1, days_in + 1):
-    d   = date(disp_year, disp_month, dn)
-    ds  = str(d)
-    cls = "cal-day"
-    if ds in st.session_state.family_events: cls += " selected"
-    elif d == today:                          cls += " today"
-    elif d < today:                           cls += " past"
-    cells.append(f"<div class='{cls}'>{dn}</div>")
-
-st.markdown(
-    f"<div class='cal-grid'>{label_html}{''.join(cells)}</div>",
-    unsafe_allow_html=True
-)
 
-st.markdown("<br>", unsafe_allow_html=True)
-
-# Date picker + Add button
-future_days = [date(disp_year, disp_month, dn)
-               for dn in range(1, days_in + 1)
-               if date(disp_year, disp_month, dn) >= today]
-
-if future_days:
-    pick_col, add_col = st.columns([4, 1])
-    with pick_col:
-        picked = st.selectbox(
-            "📆 Select a date to add as Family Event",
-            options=future_days,
-            format_func=lambda d: d.strftime("%A, %d %B %Y"),
-            key="date_picker"
+@st.fragment
+def family_event_list():
+    if not st.session_state.family_events:
+        st.markdown(
+            "<div style='color:#8b949e;font-size:0.9rem;padding:10px 0;'>"
+            "No family events added yet. Pick a date above and click ➕ Add.</div>",
+            unsafe_allow_html=True
         )
-    with add_col:
-        st.markdown("<br>", unsafe_allow_html=True)
-        if st.button("➕ Add", key="add_event_btn"):
-            ds = str(picked)
-            if ds not in st.session_state.family_events:
-                st.session_state.family_events[ds] = {"impact": "medium", "hours": 3}
-            st.rerun()
-else:
-    st.info("No future dates in this month — go to next month.")
-
-# Show added events with controls
-if st.session_state.family_events:
+        return
+
     st.markdown("---")
     st.markdown("**📋 Your Family Events — adjust impact & hours:**")
-
-    study_reduction_label = {"low": "~20% less study", "medium": "~40% less study", "high": "~70% less study"}
-    impact_emoji          = {"low": "🟢 Low", "medium": "🟡 Medium", "high": "🔴 High"}
     to_remove = []
 
     for ds in sorted(st.session_state.family_events.keys()):
@@ -443,9 +452,9 @@ if st.session_state.family_events:
 
         st.markdown(
             f"<div style='font-size:0.8rem;color:#8b949e;margin-top:4px;'>"
-            f"{impact_emoji[new_impact]} &nbsp;·&nbsp; "
+            f"{IMPACT_EMOJI[new_impact]} &nbsp;·&nbsp; "
             f"⏱️ {new_hours}h on family event &nbsp;·&nbsp; "
-            f"📉 {study_reduction_label[new_impact]} that day</div>",
+            f"📉 {STUDY_REDUCTION_LABEL[new_impact]} that day</div>",
             unsafe_allow_html=True
         )
         st.markdown("</div>", unsafe_allow_html=True)
@@ -455,12 +464,9 @@ if st.session_state.family_events:
     if to_remove:
         st.rerun()
 
-else:
-    st.markdown(
-        "<div style='color:#8b949e;font-size:0.9rem;padding:10px 0;'>"
-        "No family events added yet. Pick a date above and click ➕ Add.</div>",
-        unsafe_allow_html=True
-    )
+
+family_calendar()
+family_event_list()
 
 st.markdown('</div>', unsafe_allow_html=True)
 
@@ -519,108 +525,24 @@ with st.form("main_form"):
     with r3:
         include_games  = st.checkbox("⚽ Games / Sports", True)
         include_dinner = st.checkbox("🍽️ Dinner", True)
+    modes = ["📏 Rule-based", "⚖️ Balanced plan"] + (["🤖 ML-guided"] if model_available() else [])
+    mode = st.radio(
+        "Scheduling Mode", modes, index=0, horizontal=True,   # ML is opt-in
+        help="Balanced plan spreads every chapter evenly over the days left before the exam. "
+             "ML-guided places study hours where the model predicts the most productive minutes."
+    )
+    carry_over = st.checkbox(
+        "📖 Carry progress over days", False,
+        help="Rule-based mode: chapters studied on one day stay done instead of restarting from the full count."
+    )
+    minute_blocks = st.checkbox(
+        "⏱️ Attention-sized study blocks", False,
+        help="Rule-based mode: 25 / 45 / 60-minute study blocks with short breaks, sized from the attention level."
+    )
     st.markdown('</div>', unsafe_allow_html=True)
 
     submitted = st.form_submit_button("🚀 Generate My Timetable")
 
-# ============================================================
-# HELPERS
-# ============================================================
-def in_sleep(hour, s_start, s_hours):
-    end = (s_start + int(s_hours)) % 24
-    if s_start < end:
-        return s_start <= hour < end
-    return hour >= s_start or hour < end
-
-
-def rule_scheduler(subjects, family_events_map, days_remaining,
-                   sleep_start, sleep_hours, max_daily_study,
-                   include_breakfast, include_lunch, include_nap,
-                   include_games, include_relax, include_dinner):
-
-    today_d  = date.today()
-    schedule = []
-
-    routine_map = {}
-    if include_breakfast: routine_map[8]  = "🥣 Breakfast"
-    if include_lunch:     routine_map[13] = "🍱 Lunch"
-    if include_nap:       routine_map[14] = "😴 Nap Time"
-    if include_games:     routine_map[17] = "⚽ Games / Sports"
-    if include_relax:     routine_map[18] = "🎵 Relax Time"
-    if include_dinner:    routine_map[20] = "🍽️ Dinner"
-
-    study_reduction = {"low": 0.8, "medium": 0.6, "high": 0.3}
-
-    for d in range(days_remaining):
-        current_date = today_d + timedelta(days=d)
-        ds           = str(current_date)
-        hour         = 7
-        study_done   = 0
-
-        fam_ev          = family_events_map.get(ds, None)
-        fam_hours_left  = fam_ev["hours"] if fam_ev else 0
-        fam_impact      = fam_ev["impact"] if fam_ev else None
-        max_study_today = max_daily_study
-        if fam_ev:
-            max_study_today = max(1, int(max_daily_study * study_reduction[fam_impact]))
-
-        subjs = sorted(
-            [dict(s) for s in subjects],
-            key=lambda x: x["chapters_remaining"],
-            reverse=True
-        )
-
-        while hour < 22:
-            if in_sleep(hour, sleep_start, sleep_hours):
-                hour += 1
-                continue
-
-            # Family event block starts at 15:00
-            if fam_ev and fam_hours_left > 0 and hour >= 15:
-                schedule.append({
-                    "📅 Date":    ds,
-                    "🕐 Time":    f"{hour}:00 – {hour+1}:00",
-                    "📚 Subject": "👨‍👩‍👧 Family Event",
-                    "📋 Task":    f"Family Time · {fam_impact} impact · {fam_ev['hours']}h total"
-                })
-                fam_hours_left -= 1
-                hour += 1
-                continue
-
-            if hour in routine_map:
-                schedule.append({
-                    "📅 Date":    ds,
-                    "🕐 Time":    f"{hour}:00 – {hour+1}:00",
-                    "📚 Subject": routine_map[hour],
-                    "📋 Task":    "Routine"
-                })
-                hour += 1
-                continue
-
-            if study_done < max_study_today and subjs:
-                s = subjs[0]
-                schedule.append({
-                    "📅 Date":    ds,
-                    "🕐 Time":    f"{hour}:00 – {hour+1}:00",
-                    "📚 Subject": s["name"],
-                    "📋 Task":    f"Study — Ch. remaining: {s['chapters_remaining']}"
-                })
-                s["chapters_remaining"] -= 1
-                study_done += 1
-                if s["chapters_remaining"] <= 0:
-                    subjs.pop(0)
-            else:
-                schedule.append({
-                    "📅 Date":    ds,
-                    "🕐 Time":    f"{hour}:00 – {hour+1}:00",
-                    "📚 Subject": "🌟 Free Time",
-                    "📋 Task":    "Rest / Light Activity"
-                })
-
-            hour += 1
-
-    return schedule
-
 # ============================================================
 # GENERATE
 # ============================================================
@@ -628,22 +550,57 @@ if submitted:
     if not selected_subjects:
         st.error("❌ Please select at least one subject before generating!")
     else:
-        subjects = [
-            {"name": s, "chapters_remaining": chapter_map.get(s, 4), "difficulty": "medium"}
-            for s in selected_subjects
-        ]
-
-        timetable = rule_scheduler(
-            subjects, st.session_state.family_events, int(days_remaining),
-            sleep_start, sleep_hours, max_daily_study,
-            include_breakfast, include_lunch, include_nap,
-            include_games, include_relax, include_dinner
+        req = ScheduleRequest(
+            subjects=tuple(Subject(s, chapter_map.get(s, 4)) for s in selected_subjects),
+            days_remaining=int(days_remaining),
+            sleep_start=sleep_start,
+            sleep_hours=sleep_hours,
+            max_daily_study=max_daily_study,
+            routine=Routine(include_breakfast, include_lunch, include_nap,
+                            include_games, include_relax, include_dinner),
+            family_events={ds: FamilyEvent(ev["impact"], ev["hours"])
+                           for ds, ev in st.session_state.family_events.items()},
+            age=int(age),
+            grade=int(grade),
+            attention_span=attention_span,
+            carry_over=carry_over,
         )
-
-        df          = pd.DataFrame(timetable)
-        study_slots = len([r for r in timetable if "Study" in r["📋 Task"]])
-        fam_slots   = len([r for r in timetable if "Family" in r["📚 Subject"]])
-        total_slots = len(timetable)
+        predictor = get_predictor() if mode == "🤖 ML-guided" else None
+        engine = ("ml" if predictor is not None else
+                  "balanced" if mode == "⚖️ Balanced plan" else
+                  "minutes" if minute_blocks else "rule")
+        if mode == "🤖 ML-guided" and predictor is None:
+            plan = "minute-block rule-based" if engine == "minutes" else "rule-based"
+            st.warning(f"⚠️ The ML model could not be loaded — this is a {plan} plan, not an ML-guided one.")
+
+        # an identical submission for this child (this process or any saved
+        # document) is served from the memo and not saved again
+        key  = request_key(req, engine, f"{name}|{model_version() if engine == 'ml' else ''}")
+        memo = get_memo()
+        hit  = memo.get(key)
+        if hit is not None:
+            tt = decode(hit["tt"])
+        elif engine == "ml":
+            from scheduler.ml import schedule_ml
+            tt = schedule_ml(req, predictor)
+        elif engine == "balanced":
+            from scheduler.solver import schedule_balanced
+            tt = schedule_balanced(req)
+        elif engine == "minutes":
+            from scheduler.minutes import schedule_minutes
+            tt = schedule_minutes(req)
+        else:
+            # keep the last plan per session: when only family events changed,
+            # just the affected days are re-planned
+            planner = st.session_state.get("planner")
+            if planner is None or planner.update(req) is None:
+                planner = st.session_state.planner = IncrementalScheduler(req)
+            tt = planner.timetable()
+
+        df          = tt.to_dataframe()
+        study_slots = tt.study_slots
+        fam_slots   = tt.family_slots
+        total_slots = tt.total_slots
 
         st.markdown(f"""
         <div class="stat-row">
@@ -666,29 +623,85 @@ if submitted:
         st.success(f"✅ Timetable generated for **{name}** — {total_slots} slots across {int(days_remaining)} days!")
         st.dataframe(df, use_container_width=True, height=420)
 
-        dl1, dl2 = st.columns(2)
+        # payloads are encoded only when a button is clicked
+        dl1, dl2, dl3, dl4 = st.columns(4)
         with dl1:
-            st.download_button("⬇️ Download JSON", data=json.dumps(timetable, indent=2),
+            st.download_button("⬇️ Download JSON", data=partial(to_bytes, "json", (tt,)),
                                file_name=f"{name}_timetable.json", mime="application/json")
         with dl2:
-            st.download_button("⬇️ Download CSV", data=df.to_csv(index=False),
+            st.download_button("⬇️ Download CSV", data=partial(to_bytes, "csv", (tt,)),
                                file_name=f"{name}_timetable.csv", mime="text/csv")
+        with dl3:
+            st.download_button("⬇️ Download NDJSON", data=partial(to_bytes, "ndjson", (tt,)),
+                               file_name=f"{name}_timetable.ndjson", mime="application/x-ndjson")
+        with dl4:
+            st.download_button("⬇️ Download Parquet", data=partial(parquet_bytes, tt),
+                               file_name=f"{name}_timetable.parquet", mime="application/vnd.apache.parquet")
+
+        # write-behind: queued here, written in batches by a background thread
+        if hit is not None:
+            st.info("♻️ Same inputs as an earlier timetable — served from cache, already saved.")
+        elif mongo.status() is not False:
+            tt_doc = {"tt": encode(tt), "key": key, "created_at": datetime.now(timezone.utc)}
+            # memoised only once the write is confirmed: a dropped or failed
+            # save must not be served later as "already saved"
+            uid = get_writer().save_timetable(
+                {"name": name, "age": age, "grade": grade,
+                 "subjects": selected_subjects,
+                 "family_events": {ds: dict(ev) for ds, ev in st.session_state.family_events.items()},
+                 "created_at": datetime.now(timezone.utc)},
+                tt_doc,
+                on_written=lambda d: memo.put(key, d["_id"], d["tt"]),
+            )
+            if uid is not None:
+                st.success("📦 Saving to MongoDB in the background!")
+            else:
+                st.warning("⚠️ Save queue is full — this timetable was not saved.")
 
-        if mongo_ok:
-            try:
-                uid = users_collection.insert_one({
-                    "name": name, "age": age, "grade": grade,
-                    "subjects": selected_subjects,
-                    "family_events": st.session_state.family_events,
-                    "created_at": str(datetime.now())
-                }).inserted_id
-                timetable_collection.insert_one({
-                    "user_id": str(uid), "timetable": timetable,
-                    "created_at": str(datetime.now())
-                })
-                st.success("📦 Saved to MongoDB!")
-            except Exception as e:
-                st.warning(f"⚠️ Could not save: {e}")
+        # sampled study-slot log for retraining (hour-slot plans only; minute
+        # blocks don't match the model's one-hour target)
+        if engine != "minutes" and mongo.status() is not False:
+            get_slot_log().log(name, req, tt, engine, key, predictor,
+                               model_version() if predictor is not None else "")
+
+# ============================================================
+# STUDY LOG — minutes actually studied, for retraining
+# ============================================================
+st.markdown("---")
+st.markdown('<div class="section-title"><span>⏱️</span> How Did Studying Go?</div>', unsafe_allow_html=True)
+with st.expander("📝 Log the minutes actually studied"):
+    st.caption("Some generated timetables keep their first days' study slots for improving the ML model. "
+               "Report how long each one really went.")
+    lc1, lc2, lc3 = st.columns([2, 2, 1])
+    with lc1:
+        log_who = st.text_input("Child Name", name, key="log_name").strip()
+    with lc2:
+        log_day = st.date_input("Day", date.today(), max_value=date.today(), key="log_day")
+    with lc3:
+        if st.button("🔎 Find slots", key="log_find"):
+            if not mongo.ready(timeout=mongo.timeout_ms / 1000):
+                st.error("❌ MongoDB not connected.")
+            else:
+                st.session_state.log_slots = get_slot_log().slots(log_who, str(log_day))
+
+    log_slots = st.session_state.get("log_slots")
+    if log_slots is not None and not log_slots:
+        st.info("No logged study slots for that child and day.")
+    elif log_slots:
+        with st.form("log_form"):
+            minutes = {}
+            for s in log_slots:
+                minutes[s["_id"]] = st.number_input(
+                    f"{s['hour']}:00 · {s['subject']}", 0, 60, value=None, step=5,
+                    key=f"log_{s['_id']}", placeholder="minutes studied")
+            if st.form_submit_button("💾 Save minutes"):
+                slot_log = get_slot_log()
+                sent = [slot_log.report(sid, m) for sid, m in minutes.items() if m is not None]
+                if all(sent):
+                    st.success(f"📦 Saved {len(sent)} report(s) — thank you!")
+                    st.session_state.log_slots = None
+                else:
+                    st.warning("⚠️ Save queue is full — some reports were not saved.")
 
 # ============================================================
 # SAVED TIMETABLES
@@ -698,15 +711,45 @@ ct, cb = st.columns([3, 1])
 with ct:
     st.markdown('<div class="section-title"><span>📂</span> Saved Timetables</div>', unsafe_allow_html=True)
 with cb:
-    show_saved = st.button("📂 Show Saved")
+    if st.button("📂 Show Saved"):
+        st.session_state.saved_open   = True
+        st.session_state.saved_pages  = [None]   # cursor stack, one entry per page
+        st.session_state.saved_loaded = set()    # ids whose full timetable is shown
 
-if show_saved:
-    if not mongo_ok:
+if st.session_state.get("saved_open"):
+    if not mongo.ready(timeout=mongo.timeout_ms / 1000):
         st.error("❌ MongoDB not connected.")
     else:
-        saved = list(timetable_collection.find().sort("created_at", -1).limit(5))
+        saved_store = get_saved()
+        who = st.text_input("🔎 Filter by child name", key="saved_name").strip()
+        if who != st.session_state.get("saved_who", ""):
+            st.session_state.saved_who   = who
+            st.session_state.saved_pages = [None]
+        pages = st.session_state.saved_pages
+        saved, next_cursor = saved_store.page(name=who or None, after=pages[-1], limit=5)
         if not saved:
             st.info("No saved timetables yet.")
         for item in saved:
-            with st.expander(f"👤 {item.get('user_id','?')} — {str(item.get('created_at',''))[:16]}"):
-                st.dataframe(pd.DataFrame(item["timetable"]).head(30), use_container_width=True)
+            oid    = item["_id"]
+            loaded = oid in st.session_state.saved_loaded
+            with st.expander(f"👤 {item.get('user_id','?')} — {str(item.get('created_at',''))[:16]}",
+                             expanded=loaded):
+                counts = item.get("tt", {}).get("c")
+                if counts:
+                    st.markdown(f"📋 **{counts[0]}** slots · 📚 **{counts[1]}** study · "
+                                f"👨‍👩‍👧 **{counts[2]}** family · from {item['tt']['s']}")
+                if loaded:
+                    st.dataframe(saved_store.load(oid).to_dataframe(limit=30), use_container_width=True)
+                elif st.button("👀 Load timetable", key=f"load_{oid}"):
+                    st.session_state.saved_loaded.add(oid)
+                    st.rerun()
+
+        p1, _, p2 = st.columns([1, 4, 1])
+        with p1:
+            if len(pages) > 1 and st.button("◀ Newer", key="saved_prev"):
+                pages.pop()
+                st.rerun()
+        with p2:
+            if next_cursor is not None and st.button("Older ▶", key="saved_next"):
+                pages.append(next_cursor)
+                st.rerun()
@@ -0,0 +1,218 @@
+# ============================================================
+# batch.py — headless timetable generation from a profile file
+# ============================================================
+# python batch.py profiles.jsonl --out timetables/ --format csv --workers 8
+# python batch.py profiles.csv --mongo --workers 8
+#
+# JSONL: one ScheduleRequest.from_dict() object per line, plus an
+# optional "name" (and "age" / "grade", already request fields).
+#
+# CSV: one child per row; columns other than `name` are optional:
+#   name, subjects ("Maths:4;Science:3"), days_remaining, sleep_start,
+#   sleep_hours, max_daily_study, start_date, carry_over, age, grade,
+#   attention_span, family_events ("2026-03-10:high:4;2026-03-14:low:2"),
+#   breakfast, lunch, nap, games, relax, dinner (routine toggles)
+#
+# Profiles are scheduled in a process pool (--workers N). With --out
+# each worker streams its files straight to disk; with --mongo the
+# workers return compact codec documents and the parent writes them
+# through the batched write-behind queue.
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from scheduler import ScheduleRequest, schedule
+from scheduler.keys import request_key
+
+MODES   = ("rule", "balanced", "minutes", "ml")
+FORMATS = ("json", "csv", "ndjson", "parquet")
+ROUTINE_FIELDS = ("breakfast", "lunch", "nap", "games", "relax", "dinner")
+_TRUE = {"1", "true", "yes", "y"}
+
+
+# ============================================================
+# INPUT
+# ============================================================
+def _csv_profile(row):
+    p = {k: v for k, v in row.items() if v not in (None, "") and k not in ROUTINE_FIELDS}
+    p["subjects"] = [
+        {"name": name.strip(), "chapters_remaining": int(ch or 4)}
+        for name, _, ch in (s.partition(":") for s in row.get("subjects", "").split(";") if s.strip())
+    ]
+    p["family_events"] = {}
+    for ev in (row.get("family_events") or "").split(";"):
+        if ev.strip():
+            ds, impact, hours = (ev.strip().split(":") + ["medium", "3"])[:3]
+            p["family_events"][ds] = {"impact": impact, "hours": int(hours)}
+    p["routine"] = {f: row[f].strip().lower() in _TRUE for f in ROUTINE_FIELDS if row.get(f)}
+    if "carry_over" in p:
+        p["carry_over"] = p["carry_over"].strip().lower() in _TRUE
+    return p
+
+
+def _parse(i, parse, raw):
+    try:
+        p = parse(raw)
+        if not isinstance(p, dict):
+            raise TypeError("expected a JSON object")
+        return i, p, None
+    except (ValueError, TypeError, AttributeError) as e:
+        return i, None, f"{type(e).__name__}: {e}"
+
+
+def read_profiles(path):
+    """Yield (line number, profile dict, error) from a .csv or .jsonl file;
+    a line that cannot be parsed has profile None and the error message."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            for i, row in enumerate(csv.DictReader(f), start=2):
+                yield _parse(i, _csv_profile, row)
+        else:
+            for i, line in enumerate(f, start=1):
+                if line.strip():
+                    yield _parse(i, json.loads, line)
+
+
+# ============================================================
+# WORKER
+# ============================================================
+def build(req, mode):
+    if mode == "balanced":
+        from scheduler.solver import schedule_balanced
+        return schedule_balanced(req)
+    if mode == "minutes":
+        from scheduler.minutes import schedule_minutes
+        return schedule_minutes(req)
+    if mode == "ml":
+        from resources import get_predictor
+        from scheduler.ml import schedule_ml
+        return schedule_ml(req, get_predictor())
+    return schedule(req)
+
+
+def _file_name(line, name):
+    return f"{line:06d}_{re.sub(r'[^A-Za-z0-9_-]+', '_', name or 'child')}"
+
+
+def write_file(req, path, fmt, mode):
+    if fmt == "parquet":
+        from scheduler.arrow import write_parquet
+        write_parquet(build(req, mode), path)
+        return
+    from scheduler.core import iter_schedule
+    from scheduler.export import WRITERS
+    # rule mode is generated in day chunks, so the text writers never
+    # hold more than a week of rows
+    chunks = iter_schedule(req) if mode == "rule" else (build(req, mode),)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        WRITERS[fmt](chunks, f)
+
+
+def run_one(job):
+    """Schedule one profile. Returns (line, name, payload, error); payload
+    is the (user, timetable) Mongo document pair when no --out is given."""
+    line, profile, err, opts = job
+    if err is not None:
+        return line, "", None, err
+    name = str(profile.get("name", ""))
+    try:
+        req = ScheduleRequest.from_dict(profile).validate()
+        payload = None
+        if opts["out"]:
+            path = os.path.join(opts["out"], f"{_file_name(line, name)}.{opts['format']}")
+            write_file(req, path, opts["format"], opts["mode"])
+        else:
+            from scheduler.codec import encode
+            tt = build(req, opts["mode"])
+            now = datetime.now(timezone.utc)
+            payload = (
+                {"name": name, "age": req.age, "grade": req.grade,
+                 "subjects": [s.name for s in req.subjects],
+                 "family_events": {ds: {"impact": ev.impact, "hours": ev.hours}
+                                   for ds, ev in req.family_events.items()},
+                 "created_at": now},
+                # same key as the app and service, so their memo finds it
+                {"tt": encode(tt), "created_at": now,
+                 "key": request_key(req, opts["mode"], f"{name}|{opts['model']}")},
+            )
+        return line, name, payload, None
+    except (KeyError, ValueError, TypeError, AttributeError, OSError) as e:
+        return line, name, None, f"{type(e).__name__}: {e}"
+
+
+# ============================================================
+# DRIVER
+# ============================================================
+def run(profiles, opts, workers=1, chunksize=32):
+    """Yield run_one() results in input order."""
+    jobs = ((line, p, err, opts) for line, p, err in profiles)
+    if workers <= 1:
+        yield from map(run_one, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(run_one, jobs, chunksize=chunksize)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate timetables for a file of child profiles.")
+    ap.add_argument("profiles", help=".csv or .jsonl file")
+    dest = ap.add_mutually_exclusive_group(required=True)
+    dest.add_argument("--out", metavar="DIR", help="write one file per child into DIR")
+    dest.add_argument("--mongo", action="store_true", help="save to MongoDB (MONGODB_URI / DB_NAME)")
+    ap.add_argument("--format", choices=FORMATS, default="json")
+    ap.add_argument("--mode", choices=MODES, default="rule")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--chunksize", type=int, default=32, help="profiles sent to a worker at a time")
+    args = ap.parse_args(argv)
+
+    model = ""
+    if args.mode == "ml":
+        from resources import get_predictor, model_version
+        # loaded here once: a missing model fails the run up front, and
+        # forked workers inherit it instead of each loading their own
+        if get_predictor() is None:
+            sys.exit("--mode ml needs a trained model (run train_model.py first)")
+        model = model_version()
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    writer = None
+    if args.mongo:
+        from persistence import WriteBehindQueue
+        from resources import get_mongo
+        mongo = get_mongo()
+        if not mongo.ready(timeout=mongo.timeout_ms / 1000):
+            sys.exit("MongoDB is not reachable")
+        # batch jobs wait for queue space instead of dropping documents
+        writer = WriteBehindQueue(mongo, batch_size=500, block_timeout=60.0)
+
+    opts = {"mode": args.mode, "format": args.format, "out": args.out, "model": model}
+    t0 = time.perf_counter()
+    done = failed = 0
+    for line, name, payload, err in run(read_profiles(args.profiles), opts, args.workers, args.chunksize):
+        if err is None and payload is not None and writer.save_timetable(*payload) is None:
+            err = "write queue full"
+        if err is not None:
+            failed += 1
+            print(f"{args.profiles}:{line}: {name or '?'}: {err}", file=sys.stderr)
+        else:
+            done += 1
+    lost = 0
+    if writer is not None:
+        writer.flush()
+        writer.close()
+        lost = writer.stats()["failed"]
+    print(f"Generated {done} timetables ({failed} failed) in {time.perf_counter() - t0:.1f}s")
+    if lost:
+        print(f"{lost} documents could not be written to MongoDB", file=sys.stderr)
+    return 1 if failed or lost else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
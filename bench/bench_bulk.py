@@ -0,0 +1,74 @@
+# ============================================================
+# bench/bench_bulk.py — cohort scheduler vs per-child loop
+# ============================================================
+# python bench/bench_bulk.py --children 10000 --days 120
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import FamilyEvent, Routine, ScheduleRequest, Subject, schedule
+from scheduler.bulk import schedule_cohort
+
+SUBJECTS = ["Maths", "Science", "English", "Hindi", "Gujarati",
+            "Social Science", "Computer", "Grammar", "Moral Science", "PT"]
+
+
+def make_cohort(n, days, seed=0):
+    rng   = random.Random(seed)
+    start = date.today()
+    reqs  = []
+    for _ in range(n):
+        subs = rng.sample(SUBJECTS, rng.randint(1, len(SUBJECTS)))
+        events = {
+            str(start + timedelta(days=rng.randrange(days))):
+                FamilyEvent(rng.choice(["low", "medium", "high"]), rng.randint(1, 8))
+            for _ in range(rng.randint(0, 6))
+        }
+        reqs.append(ScheduleRequest(
+            subjects=tuple(Subject(s, rng.randint(1, 20)) for s in subs),
+            days_remaining=days,
+            sleep_start=rng.choice([20, 21, 22, 23]),
+            sleep_hours=rng.choice([6.0, 7.0, 8.0, 9.0, 10.0]),
+            max_daily_study=rng.randint(1, 8),
+            routine=Routine(*(rng.random() < 0.8 for _ in range(6))),
+            family_events=events,
+            start_date=start,
+        ))
+    return reqs
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--children", type=int, default=10000)
+    ap.add_argument("--days", type=int, default=120)
+    ap.add_argument("--loop-children", type=int, default=500,
+                    help="children timed with the per-child loop (extrapolated)")
+    args = ap.parse_args()
+
+    reqs = make_cohort(args.children, args.days)
+
+    t0 = time.perf_counter()
+    cohort = schedule_cohort(reqs)
+    t_bulk = time.perf_counter() - t0
+
+    sample = reqs[:args.loop_children]
+    t0 = time.perf_counter()
+    for r in sample:
+        schedule(r)
+    t_loop = (time.perf_counter() - t0) / max(len(sample), 1) * len(reqs)
+
+    slots = int(cohort.total_slots.sum())
+    print(f"children={args.children} days={args.days} slots={slots:,}")
+    print(f"bulk   : {t_bulk:8.3f} s  ({slots / t_bulk:,.0f} slots/s)")
+    print(f"loop   : {t_loop:8.3f} s  (extrapolated from {len(sample)} children)")
+    print(f"speedup: {t_loop / t_bulk:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# ============================================================
+# bench/bench_suite.py — scheduling path benchmarks
+# ============================================================
+# python bench/bench_suite.py --out bench/results.json
+# python bench/bench_suite.py --quick --compare bench/results.json
+#
+# Scaling curves: each sweep varies one input (days, subjects,
+# family events, cohort size) with the others held at DEFAULTS, and
+# times every stage of the request path at each point:
+#
+#   schedule    core.schedule -> Timetable
+#   rows        legacy rule_scheduler rows (list of dicts)
+#   dataframe   Timetable.to_dataframe
+#   json / csv  Timetable.to_json / to_csv
+#   insert      codec.encode + insert_one into mongomock (local stand-in)
+#   cohort      bulk.schedule_cohort (cohort sweep only; per call)
+#
+# Reported per point: iterations, throughput (items/s), p50 / p99
+# latency (ms) and peak traced memory (KiB, from one extra untimed
+# run under tracemalloc). Inputs use fixed seeds and a fixed start
+# date, so two result files differ only by the code under test and
+# the machine.
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import FamilyEvent, ScheduleRequest, Subject, rule_scheduler, schedule
+from scheduler.codec import encode
+
+SUBJECTS = ["Maths", "Science", "English", "Hindi", "Gujarati",
+            "Social Science", "Computer", "Grammar", "Moral Science", "PT"]
+START    = date(2026, 1, 5)
+DEFAULTS = {"days": 30, "subjects": 5, "events": 2, "cohort": 100}
+SWEEPS   = {
+    "days":     [1, 7, 14, 30, 60, 90, 120],
+    "subjects": [1, 2, 3, 5, 7, 10],
+    "events":   [0, 1, 2, 4, 8, 16],
+    "cohort":   [10, 100, 1000, 5000],
+}
+QUICK_SWEEPS = {"days": [1, 30, 120], "subjects": [1, 10], "events": [0, 8], "cohort": [10, 1000]}
+
+
+# ============================================================
+# INPUTS
+# ============================================================
+def make_request(days, subjects, events, seed=0):
+    rng = random.Random(seed)
+    return ScheduleRequest(
+        subjects=tuple(Subject(s, rng.randint(1, 20)) for s in SUBJECTS[:subjects]),
+        days_remaining=days,
+        family_events={
+            str(START + timedelta(days=d)): FamilyEvent(rng.choice(["low", "medium", "high"]), rng.randint(1, 6))
+            for d in rng.sample(range(days), min(events, days))
+        },
+        start_date=START,
+    )
+
+
+def legacy_args(req):
+    r = req.routine
+    return ([{"name": s.name, "chapters_remaining": s.chapters_remaining} for s in req.subjects],
+            {ds: {"impact": ev.impact, "hours": ev.hours} for ds, ev in req.family_events.items()},
+            req.days_remaining, req.sleep_start, req.sleep_hours, req.max_daily_study,
+            r.breakfast, r.lunch, r.nap, r.games, r.relax, r.dinner)
+
+
+# ============================================================
+# CASES — each returns (callable, items per call)
+# ============================================================
+def _collection():
+    try:
+        import mongomock
+    except ImportError:
+        return None
+    return mongomock.MongoClient().bench.timetables
+
+
+def cases(p, coll):
+    req = make_request(p["days"], p["subjects"], p["events"])
+    tt  = schedule(req)
+    out = {
+        "schedule":  (lambda: schedule(req), 1),
+        "rows":      (lambda: rule_scheduler(*legacy_args(req)), 1),
+        "dataframe": (tt.to_dataframe, 1),
+        "json":      (tt.to_json, 1),
+        "csv":       (tt.to_csv, 1),
+    }
+    if coll is not None:
+        out["insert"] = (lambda: coll.insert_one({"tt": encode(tt)}), 1)
+    return out
+
+
+def cohort_case(n):
+    from scheduler.bulk import schedule_cohort
+    reqs = [make_request(DEFAULTS["days"], 1 + i % len(SUBJECTS), DEFAULTS["events"], seed=i)
+            for i in range(n)]
+    return {"cohort": (lambda: schedule_cohort(reqs), n)}
+
+
+# ============================================================
+# MEASUREMENT
+# ============================================================
+def percentile(sorted_vals, q):
+    i = min(len(sorted_vals) - 1, max(0, round(q * (len(sorted_vals) - 1))))
+    return sorted_vals[i]
+
+
+def measure(fn, items, min_time, min_iters=5, max_iters=2000):
+    fn()                                    # warm caches (templates, imports)
+    times = []
+    deadline = time.perf_counter() + min_time
+    while len(times) < max_iters and (len(times) < min_iters or time.perf_counter() < deadline):
+        t0 = time.perf_counter_ns()
+        fn()
+        times.append(time.perf_counter_ns() - t0)
+    times.sort()
+    mean = sum(times) / len(times)
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "iters":      len(times),
+        "throughput": round(items / (mean / 1e9), 2),
+        "p50_ms":     round(percentile(times, 0.50) / 1e6, 4),
+        "p99_ms":     round(percentile(times, 0.99) / 1e6, 4),
+        "peak_kib":   round(peak / 1024, 1),
+    }
+
+
+def run(sweeps, min_time, only=None):
+    coll = _collection()
+    results = []
+    for dim, values in sweeps.items():
+        for v in values:
+            p = dict(DEFAULTS, **{dim: v})
+            todo = cohort_case(v) if dim == "cohort" else cases(p, coll)
+            for name, (fn, items) in todo.items():
+                if only and name not in only:
+                    continue
+                r = {"case": name, "sweep": dim, "value": v, **measure(fn, items, min_time)}
+                results.append(r)
+                print(f"{name:10} {dim}={v:<6} p50={r['p50_ms']:9.3f}ms p99={r['p99_ms']:9.3f}ms "
+                      f"{r['throughput']:12,.1f}/s peak={r['peak_kib']:9.1f}KiB", flush=True)
+    return results
+
+
+def meta(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "quick": args.quick, "min_time": args.min_time, "defaults": DEFAULTS}
+
+
+def compare(old, new, threshold):
+    """Print p50 ratios new/old per point; returns the number of regressions."""
+    before = {(r["case"], r["sweep"], r["value"]): r for r in old["results"]}
+    bad = 0
+    print(f"\nvs {old['meta'].get('commit') or 'baseline'}  (ratio = new p50 / old p50)")
+    for r in new["results"]:
+        o = before.get((r["case"], r["sweep"], r["value"]))
+        if o is None or not o["p50_ms"]:
+            continue
+        ratio = r["p50_ms"] / o["p50_ms"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        bad += bool(flag)
+        print(f"{r['case']:10} {r['sweep']}={r['value']:<6} {ratio:6.2f}x{flag}")
+    return bad
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--quick", action="store_true", help="fewer sweep points")
+    ap.add_argument("--min-time", type=float, default=0.3, help="seconds timed per point")
+    ap.add_argument("--case", action="append", help="only these cases (repeatable)")
+    ap.add_argument("--compare", metavar="OLD.json", help="report p50 ratios against an earlier run")
+    ap.add_argument("--threshold", type=float, default=1.25, help="ratio counted as a regression")
+    args = ap.parse_args()
+
+    report = {"meta": meta(args), "results": run(QUICK_SWEEPS if args.quick else SWEEPS,
+                                                  args.min_time, set(args.case or ()))}
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {len(report['results'])} results to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            sys.exit(1 if compare(json.load(f), report, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
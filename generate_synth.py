@@ -1,59 +1,81 @@
 # generate_synth.py
-import random
-import csv
-from datetime import datetime, timedelta
+# Synthetic training rows for the effective-minutes model.
+#
+# python generate_synth.py                                  6000 rows -> synth.csv
+# python generate_synth.py --rows 10000000 --workers 8      chunked, sharded
+# python generate_synth.py --rows 10000000 --out synth.parquet
+#
+# Whole columns are drawn at once from a seeded NumPy Generator. Each
+# worker process owns one shard with its own SeedSequence child
+# stream, so shards are independent and a given (--seed, --rows,
+# --workers, --chunk) always reproduces the same file. Shards write
+# `--chunk` rows at a time to part files (constant memory); CSV
+# parts are then concatenated into the single output file, Parquet
+# output with several shards is a directory of part files.
+import argparse
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pcsv
+import pyarrow.parquet as pq
 
 subjects = ["Math","Science","English","History","Geography","Computer","Hindi","Physics","Chemistry"]
 difficulties = {"easy": 0.8, "medium": 1.0, "hard": 1.2}
+DIFFICULTY_NAMES = np.array(list(difficulties))
+DIFFICULTY_FACTOR = np.array(list(difficulties.values()))
+SLOT_HOURS = np.array([9,10,11,14,15,16,18,19])
+
+COLUMNS = ["age","grade","sleep_hours","days_remaining","family_event","slot_hour","is_weekend",
+           "attention_span","subject","subj_difficulty","chapters_remaining","urgency","effective_minutes"]
+
+
+def round1(x):
+    """round(x, 1) exactly as Python rounds: np.round scales by 10 first and
+    can land on the other side of a .x5 tie, so ties are redone in Python."""
+    r = np.round(x, 1)
+    tie = np.abs((x * 10) % 1 - 0.5) < 1e-6
+    if tie.any():
+        r[tie] = [round(v, 1) for v in x[tie].tolist()]
+    return r
 
-def sample_row():
+
+def sample_columns(rng, n):
     # user / global features
-    age = random.randint(8,18)
-    grade = random.randint(1,12)
-    sleep_hours = round(random.uniform(6,10),1)
-    days_remaining = random.randint(1,30)
-    family_event = random.choice([0,0,0,1])   # mostly no event
-    slot_hour = random.choice([9,10,11,14,15,16,18,19])  # hour-of-day
-    is_weekend = random.choice([0,0,0,1])
-    attention_span = random.choice([0.6,0.8,1.0,1.2])  # shorter -> smaller multiplier
+    age = rng.integers(8, 19, n)
+    grade = rng.integers(1, 13, n)
+    sleep_hours = round1(rng.uniform(6, 10, n))
+    days_remaining = rng.integers(1, 31, n)
+    family_event = (rng.integers(0, 4, n) == 3).astype(np.int64)   # mostly no event
+    slot_hour = rng.choice(SLOT_HOURS, n)                           # hour-of-day
+    is_weekend = (rng.integers(0, 4, n) == 3).astype(np.int64)
+    attention_span = rng.choice([0.6,0.8,1.0,1.2], n)              # shorter -> smaller multiplier
 
     # subject features
-    subj = random.choice(subjects)
-    subj_difficulty = random.choice(["easy","medium","hard"])
-    subj_difficulty_factor = difficulties[subj_difficulty]
+    subj = rng.integers(0, len(subjects), n)
+    diff = rng.integers(0, len(difficulties), n)
 
     # urgency: chapters_remaining / days_remaining
-    chapters_remaining = random.randint(0,8)
-    urgency = (chapters_remaining + 0.5) / max(1, days_remaining)
-
-    # base effective minutes (60 minute slot)
-    base = 60.0
-
-    # heuristics to generate label (you can tune)
-    # good sleep + morning slot + easy subject + long attention -> high minutes
-    morning_bonus = 1.05 if 8 <= slot_hour <= 11 else 0.95
-    weekend_penalty = 0.9 if is_weekend else 1.0
-    family_penalty = 0.7 if family_event else 1.0
-
-    # predicted effective minutes
-    # factors: attention span, difficulty, urgency (higher urgency increases focused minutes slightly),
-    # sleep, morning/afternoon, weekend, family
-    effective = base * attention_span / subj_difficulty_factor
+    chapters_remaining = rng.integers(0, 9, n)
+    urgency = (chapters_remaining + 0.5) / np.maximum(1, days_remaining)
+
+    # same label formula as the original per-row generator:
+    # base 60 min * attention / difficulty, morning / weekend / family
+    # factors, sleep effect, urgency boost, gaussian noise, clamp
+    morning_bonus = np.where((8 <= slot_hour) & (slot_hour <= 11), 1.05, 0.95)
+    weekend_penalty = np.where(is_weekend == 1, 0.9, 1.0)
+    family_penalty = np.where(family_event == 1, 0.7, 1.0)
+    effective = 60.0 * attention_span / DIFFICULTY_FACTOR[diff]
     effective *= morning_bonus * weekend_penalty * family_penalty
-    # sleep effect
-    if sleep_hours < 7:
-        effective *= 0.8
-    elif sleep_hours > 9:
-        effective *= 1.05
-    # urgency effect (if very urgent, maybe more focused)
-    effective *= (1.0 + min(urgency, 1.0) * 0.2)
-    # add some noise
-    effective += random.gauss(0,8)
-
-    # clamp
-    effective = max(10, min(60, effective))
-
-    return {
+    effective *= np.where(sleep_hours < 7, 0.8, np.where(sleep_hours > 9, 1.05, 1.0))
+    effective *= 1.0 + np.minimum(urgency, 1.0) * 0.2
+    effective += rng.normal(0, 8, n)
+    effective = np.clip(effective, 10, 60)
+
+    return pd.DataFrame({
         "age": age,
         "grade": grade,
         "sleep_hours": sleep_hours,
@@ -62,21 +84,75 @@ def sample_row():
         "slot_hour": slot_hour,
         "is_weekend": is_weekend,
         "attention_span": attention_span,
-        "subject": subj,
-        "subj_difficulty": subj_difficulty,
+        "subject": np.array(subjects)[subj],
+        "subj_difficulty": DIFFICULTY_NAMES[diff],
         "chapters_remaining": chapters_remaining,
         "urgency": urgency,
-        "effective_minutes": round(effective,1)
-    }
+        "effective_minutes": round1(effective),
+    }, columns=COLUMNS)
+
+
+def _writer(path, fmt, schema):
+    if fmt == "parquet":
+        return pq.ParquetWriter(path, schema, compression="zstd")
+    # Arrow's CSV writer is ~8x faster than DataFrame.to_csv and prints
+    # floats as shortest round-trip text; values never need quoting
+    return pcsv.CSVWriter(path, schema, write_options=pcsv.WriteOptions(
+        quoting_style="none", quoting_header="none"))
+
+
+def write_shard(seed, n, path, fmt, chunk):
+    """Generate `n` rows from one seed stream into `path`, `chunk` rows at a time."""
+    rng = np.random.default_rng(seed)
+    writer = None
+    try:
+        for start in range(0, n, chunk):
+            table = pa.Table.from_pandas(sample_columns(rng, min(chunk, n - start)), preserve_index=False)
+            if writer is None:
+                writer = _writer(path, fmt, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def generate(n=5000, out="synth.csv", workers=1, chunk=1_000_000, seed=None):
+    fmt = "parquet" if out.endswith(".parquet") else "csv"
+    shards = max(1, min(workers, n))
+    seeds = np.random.SeedSequence(seed).spawn(shards)
+    sizes = [n // shards + (i < n % shards) for i in range(shards)]
+
+    if shards == 1:
+        write_shard(seeds[0], n, out, fmt, chunk)
+        return out
+
+    if fmt == "parquet":
+        os.makedirs(out, exist_ok=True)
+        parts = [os.path.join(out, f"part-{i:05d}.parquet") for i in range(shards)]
+    else:
+        parts = [f"{out}.part-{i:05d}" for i in range(shards)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(write_shard, seeds, sizes, parts, [fmt] * shards, [chunk] * shards))
+
+    if fmt == "csv":
+        with open(out, "wb") as dst:
+            for i, part in enumerate(parts):
+                with open(part, "rb") as src:
+                    if i:
+                        src.readline()          # header already written
+                    shutil.copyfileobj(src, dst, 1 << 20)
+                os.remove(part)
+    return out
 
-def generate(n=5000, out="synth.csv"):
-    keys = list(sample_row().keys())
-    with open(out, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=keys)
-        w.writeheader()
-        for _ in range(n):
-            w.writerow(sample_row())
 
 if __name__ == "__main__":
-    generate(6000, "synth.csv")
-    print("synth.csv created")
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=6000)
+    ap.add_argument("--out", default="synth.csv", help=".csv or .parquet")
+    ap.add_argument("--workers", type=int, default=1, help="shards / processes")
+    ap.add_argument("--chunk", type=int, default=1_000_000, help="rows generated and written at a time")
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args()
+    out = generate(args.rows, args.out, args.workers, args.chunk, args.seed)
+    print(f"{out} created")
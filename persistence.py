@@ -0,0 +1,514 @@
+# ============================================================
+# persistence.py — write-behind queue for generated timetables
+# ============================================================
+# The request path only enqueues documents; a background thread
+# drains the queue and writes them with insert_many in batches,
+# retrying with exponential backoff. Documents get their _id on
+# the client, so the timetable can reference its user before
+# either is written and a retried batch is idempotent (duplicate
+# key errors on _id from a partially applied batch are ignored).
+# A duplicate on another unique index (a timetable `key`) means a
+# different document already holds it: that one is reported to the
+# document's `on_written` callback instead, and the user document
+# queued with it is removed again. Callers that must know a document
+# really landed (the memo) pass `on_written`; it runs on the writer
+# thread after the insert.
+
+import atexit
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+DUPLICATE_KEY = 11000
+
+
+class WriteBehindQueue:
+    def __init__(self, mongo, batch_size=100, flush_interval=1.0, max_queue=10_000,
+                 block_timeout=0.0, max_retries=5, backoff=0.5, max_backoff=30.0):
+        self.mongo          = mongo            # resources.MongoResource
+        self.batch_size     = batch_size
+        self.flush_interval = flush_interval   # max seconds a doc waits for batch-mates
+        self.block_timeout  = block_timeout    # 0 = drop when full, >0 = wait that long first
+        self.max_retries    = max_retries
+        self.backoff        = backoff
+        self.max_backoff    = max_backoff
+        self._q       = queue.Queue(maxsize=max_queue)
+        self._stop    = threading.Event()
+        self._lock    = threading.Lock()
+        self._thread  = None
+        self.metrics  = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0,
+                         "duplicates": 0, "batches": 0, "retries": 0, "blocked": 0}
+
+    # ---------- producer side ----------
+    def enqueue(self, collection, doc, on_written=None):
+        """Queue one document; returns False if it was dropped (queue full).
+        `on_written(doc)` is called once the document has been written."""
+        return self._put(((collection, doc, on_written),))
+
+    def _put(self, entries):
+        # one queue item per call, so documents queued together are
+        # dropped together or not at all
+        self._ensure_started()
+        try:
+            if self.block_timeout > 0 and self._q.full():
+                self._count("blocked")
+            self._q.put(entries, block=self.block_timeout > 0,
+                        timeout=self.block_timeout or None)
+        except queue.Full:
+            self._count("dropped", len(entries))
+            return False
+        self._count("enqueued", len(entries))
+        return True
+
+    def save_timetable(self, user_doc, timetable_doc, on_written=None):
+        """Queue a user + timetable pair as one item; returns the user's
+        ObjectId, or None if the queue was full (neither is saved). `on_written(timetable_doc)` runs once
+        the timetable has been written."""
+        from bson import ObjectId
+        uid = user_doc.setdefault("_id", ObjectId())
+        timetable_doc.setdefault("_id", ObjectId())
+        timetable_doc.setdefault("user_id", str(uid))
+        timetable_doc.setdefault("name", user_doc.get("name", ""))   # Show Saved filters on it
+        if not self._put((("users", user_doc, None), ("timetables", timetable_doc, on_written))):
+            return None
+        return uid
+
+    def stats(self):
+        with self._lock:
+            return dict(self.metrics, queued=self._q.qsize())
+
+    # ---------- writer thread ----------
+    def _count(self, key, n=1):
+        with self._lock:
+            self.metrics[key] += n
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+
+    def _next_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            wait = deadline - time.monotonic()
+            if wait <= 0 and batch:
+                break
+            try:
+                batch.append(self._q.get(timeout=max(wait, 0.05)))
+            except queue.Empty:
+                if batch or self._stop.is_set():
+                    break
+        return batch
+
+    def _run(self):
+        while not (self._stop.is_set() and self._q.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            by_coll = {}
+            for entries in batch:
+                for coll, doc, on_written in entries:
+                    by_coll.setdefault(coll, []).append((doc, on_written))
+            # users first so a timetable is never visible before its user
+            for coll in sorted(by_coll, key=lambda c: c != "users"):
+                items = by_coll[coll]
+                taken = self._write(coll, [doc for doc, _ in items])
+                if taken is None:
+                    continue
+                if taken:
+                    users = {doc["_id"] for doc, _ in by_coll.get("users", ())}
+                    items = self._resolve_taken(coll, items, taken, users)
+                self._acknowledge(items)
+            for _ in batch:
+                self._q.task_done()
+
+    def _write(self, coll, docs):
+        """Insert `docs`; returns {position: unique-key query} for documents
+        whose key another document already holds, or None if it failed."""
+        from pymongo.errors import BulkWriteError
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.mongo.collection(coll).insert_many(docs, ordered=False)
+                self._count("written", len(docs))
+                self._count("batches")
+                return {}
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if all(err.get("code") == DUPLICATE_KEY for err in errors):
+                    # on _id: already written by an earlier, partially applied
+                    # attempt; on any other unique key: held by another document
+                    taken = {}
+                    for err in errors:
+                        pattern = err.get("keyPattern") or {"_id": 1}
+                        if "_id" not in pattern:
+                            doc = docs[err["index"]]
+                            taken[err["index"]] = {k: doc.get(k) for k in pattern}
+                    self._count("written", len(docs) - len(taken))
+                    self._count("duplicates", len(taken))
+                    self._count("batches")
+                    return taken
+            except Exception:
+                pass
+            if attempt == self.max_retries or (self._stop.is_set() and attempt):
+                break
+            self._count("retries")
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+        self._count("failed", len(docs))
+        return None
+
+    def _resolve_taken(self, coll, items, taken, users):
+        """Point the callbacks of documents in `taken` at the stored document
+        that holds their key, and delete the user documents (written in this
+        batch) that were queued with them."""
+        from bson import ObjectId
+        items, orphans = list(items), []
+        for pos, query in taken.items():
+            doc, on_written = items[pos]
+            try:
+                existing = self.mongo.collection(coll).find_one(query)
+            except Exception:
+                existing = None
+            items[pos] = (existing, on_written if existing is not None else None)
+            uid = doc.get("user_id")
+            if uid is not None and ObjectId.is_valid(uid) and ObjectId(uid) in users:
+                orphans.append(ObjectId(uid))
+        if orphans:
+            try:
+                self.mongo.collection("users").delete_many({"_id": {"$in": orphans}})
+            except Exception:
+                pass                             # an orphan user is harmless
+        return items
+
+    def _acknowledge(self, items):
+        for doc, on_written in items:
+            if on_written is not None:
+                try:
+                    on_written(doc)
+                except Exception:
+                    pass                         # a callback must not stop the writer
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far has been attempted."""
+        if self._thread is None:
+            return True
+        end = None if timeout is None else time.monotonic() + timeout
+        while self._q.unfinished_tasks:
+            if end is not None and time.monotonic() >= end:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout=10.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+# ============================================================
+# MIGRATION — legacy row lists -> compact codec (scheduler.codec)
+# ============================================================
+def migrate_legacy(collection, batch_size=500):
+    """Rewrite old documents: {"timetable": [rows...]} -> {"tt": <codec>} and
+    string created_at -> datetime. Safe to re-run; returns the number of
+    documents converted."""
+    from pymongo import UpdateOne
+    from scheduler.codec import encode, from_rows
+
+    done, ops = 0, []
+    legacy = {"$or": [{"timetable": {"$exists": True}}, {"created_at": {"$type": "string"}}]}
+    cursor = collection.find(legacy, {"timetable": 1, "created_at": 1}, batch_size=batch_size)
+    for doc in cursor:
+        update = {}
+        if "timetable" in doc:
+            update["$set"]   = {"tt": encode(from_rows(doc["timetable"]))}
+            update["$unset"] = {"timetable": ""}
+        if isinstance(doc.get("created_at"), str):
+            # legacy stamps are naive local time (datetime.now().isoformat());
+            # new documents are UTC, so convert before they share the index
+            created = datetime.fromisoformat(doc["created_at"]).astimezone(timezone.utc)
+            update.setdefault("$set", {})["created_at"] = created
+        ops.append(UpdateOne({"_id": doc["_id"]}, update))
+        if len(ops) >= batch_size:
+            done += collection.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        done += collection.bulk_write(ops, ordered=False).modified_count
+    return done
+
+
+def backfill_names(timetables, users, batch_size=500):
+    """Copy the child's name from `users` onto timetables saved before it
+    was stored on them. Safe to re-run; returns the number updated."""
+    from bson import ObjectId
+    from bson.errors import InvalidId
+    from pymongo import UpdateOne
+
+    done = 0
+    cursor = timetables.find({"name": {"$exists": False}}, {"user_id": 1}, batch_size=batch_size)
+    while True:
+        docs = [doc for _, doc in zip(range(batch_size), cursor)]
+        if not docs:
+            return done
+        uids = set()
+        for doc in docs:
+            try:
+                uids.add(ObjectId(doc.get("user_id")))
+            except (InvalidId, TypeError):
+                pass
+        names = {str(u["_id"]): u.get("name", "")
+                 for u in users.find({"_id": {"$in": list(uids)}}, {"name": 1})}
+        ops = [UpdateOne({"_id": doc["_id"]}, {"$set": {"name": names.get(doc.get("user_id"), "")}})
+               for doc in docs]
+        done += timetables.bulk_write(ops, ordered=False).modified_count
+
+
+# ============================================================
+# QUERIES — "Show Saved"
+# ============================================================
+# Pages are keyset-paginated on (created_at, _id) descending, over
+# all timetables or one child's (the name is stored on each
+# timetable), so every page is an index range scan whatever the
+# page number.
+# List queries project out the timetable payload; the full
+# document is fetched only when a timetable is opened.
+SUMMARY_PROJECTION = {"tt.b": 0, "tt.i": 0, "timetable": 0}
+
+
+class SavedTimetables:
+    def __init__(self, mongo):
+        self.mongo    = mongo            # resources.MongoResource
+        self._indexed = False
+
+    @property
+    def timetables(self):
+        return self.mongo.collection("timetables")
+
+    def ensure_indexes(self):
+        if self._indexed:
+            return
+        self.timetables.create_index([("name", 1), ("created_at", -1), ("_id", -1)], name="name_created")
+        self.timetables.create_index([("created_at", -1), ("_id", -1)], name="created")
+        # one saved document per canonical input hash (see TimetableMemo)
+        self.timetables.create_index([("key", 1)], name="key", unique=True,
+                                     partialFilterExpression={"key": {"$exists": True}})
+        self.mongo.collection("users").create_index([("name", 1)], name="name")
+        self._indexed = True
+
+    def page(self, name=None, after=None, limit=5):
+        """One page of summaries, newest first. `after` is the cursor returned
+        with the previous page; returns (items, next_cursor or None)."""
+        self.ensure_indexes()
+        query = {}
+        if name:
+            query["name"] = name
+        if after is not None:
+            created, _id = after
+            query["$or"] = [{"created_at": {"$lt": created}},
+                            {"created_at": created, "_id": {"$lt": _id}}]
+        items = list(self.timetables.find(query, SUMMARY_PROJECTION)
+                     .sort([("created_at", -1), ("_id", -1)])
+                     .limit(limit + 1))
+        nxt = None
+        if len(items) > limit:
+            items = items[:limit]
+            nxt = (items[-1].get("created_at"), items[-1]["_id"])
+        return items, nxt
+
+    def load(self, _id):
+        """Full timetable for one saved document."""
+        from scheduler.codec import timetable_from_doc
+        return timetable_from_doc(self.timetables.find_one({"_id": _id}) or {})
+
+
+# ============================================================
+# MEMO — generated timetables by canonical input hash
+# ============================================================
+# Tier 1 is a per-process LRU, tier 2 the saved `timetables`
+# documents themselves, found through their unique `key` field
+# (scheduler.keys.request_key). A hit in either tier means the
+# inputs were generated and saved before: the stored codec document
+# is served and nothing is written again.
+class TimetableMemo:
+    def __init__(self, saved, maxsize=256):
+        self.saved    = saved            # SavedTimetables
+        self.maxsize  = maxsize
+        self._data    = OrderedDict()    # key -> {"_id", "tt"}
+        self._lock    = threading.Lock()
+        self.metrics  = {"hits": 0, "mongo_hits": 0, "misses": 0}
+
+    def get(self, key):
+        """{"_id", "tt"} of the saved timetable for `key`, or None."""
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None:
+                self._data.move_to_end(key)
+                self.metrics["hits"] += 1
+                return hit
+        hit = None
+        if self.saved.mongo.status():            # known healthy; never wait on a probe
+            try:
+                self.saved.ensure_indexes()
+                hit = self.saved.timetables.find_one({"key": key}, {"tt": 1})
+            except Exception:
+                hit = None                       # cache only; generate instead
+        if hit is None or "tt" not in hit:
+            self._count("misses")
+            return None
+        self._count("mongo_hits")
+        self.put(key, hit["_id"], hit["tt"])
+        return hit
+
+    def put(self, key, _id, tt_doc):
+        with self._lock:
+            self._data[key] = {"_id": _id, "tt": tt_doc}
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _count(self, name):
+        with self._lock:
+            self.metrics[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.metrics, size=len(self._data), maxsize=self.maxsize)
+
+
+# ============================================================
+# SLOT LOG — study slots and reported minutes, for retraining
+# ============================================================
+# Append-only. Each logged study hour is a "slot" document holding
+# the model's feature vector (scheduler.ml.FEATURES) and, for ML
+# plans, the predicted minutes; each report of the minutes actually
+# studied is a separate "outcome" document pointing at its slot, so
+# nothing is ever updated in place and the latest report wins at
+# training time (outcome_rows). Logging is sampled per timetable,
+# covers only the first `max_days` days, and goes through its own
+# WriteBehindQueue: the request path just builds dicts.
+SLOT_LOG = "slot_log"
+
+
+class SlotLog:
+    def __init__(self, writer, sample_rate=0.25, max_days=7, collection=SLOT_LOG):
+        self.writer      = writer           # WriteBehindQueue
+        self.sample_rate = sample_rate
+        self.max_days    = max_days
+        self.collection  = collection
+        self._indexed    = False
+        self._lock       = threading.Lock()
+        self.metrics     = {"sampled": 0, "skipped": 0, "slots": 0, "outcomes": 0}
+
+    def log(self, name, req, tt, mode, key="", predictor=None, model=""):
+        """Queue slot documents for `tt` if this timetable is sampled;
+        returns how many were queued. `predictor` (predict_columns) adds
+        the predicted minutes — from its cache, for the plan it just made."""
+        if random.random() >= self.sample_rate:
+            self._count("skipped")
+            return 0
+        self._count("sampled")
+        from scheduler.ml import FEATURES, slot_features
+        idx, cols = slot_features(req, tt, self.max_days)
+        pred = predictor.predict_columns(cols) if predictor is not None and idx else None
+        now  = datetime.now(timezone.utc)
+        n    = 0
+        for j, i in enumerate(idx):
+            doc = {
+                "kind": "slot", "name": name, "key": key, "mode": mode, "model": model,
+                "date": str(tt.start_date + timedelta(days=tt.day[i])), "hour": tt.hour[i],
+                "subject": cols["subject"][j],
+                "x": {f: cols[f][j] for f in FEATURES},
+                "pred": None if pred is None else round(float(pred[j]), 2),
+                "created_at": now,
+            }
+            if not self.writer.enqueue(self.collection, doc):
+                break                            # queue full: drop the rest
+            n += 1
+        self._count("slots", n)
+        return n
+
+    def report(self, slot_id, minutes):
+        """Queue the minutes actually studied in one logged slot."""
+        ok = self.writer.enqueue(self.collection, {
+            "kind": "outcome", "slot": slot_id, "minutes": int(minutes),
+            "created_at": datetime.now(timezone.utc)})
+        self._count("outcomes", ok)
+        return ok
+
+    def ensure_indexes(self):
+        if self._indexed:
+            return
+        coll = self.writer.mongo.collection(self.collection)
+        coll.create_index([("name", 1), ("date", 1), ("created_at", -1)], name="name_date",
+                          partialFilterExpression={"kind": "slot"})
+        coll.create_index([("kind", 1), ("created_at", 1)], name="kind_created")
+        self._indexed = True
+
+    def slots(self, name, day, limit=200):
+        """Logged study slots of one child on one date (ISO string), from the
+        newest plan that covered each hour, ordered by hour."""
+        self.ensure_indexes()
+        cur = (self.writer.mongo.collection(self.collection)
+               .find({"kind": "slot", "name": name, "date": day},
+                     {"hour": 1, "subject": 1, "pred": 1, "mode": 1})
+               .sort("created_at", -1).limit(limit))
+        by_hour = {}
+        for doc in cur:
+            by_hour.setdefault(doc["hour"], doc)
+        return [by_hour[h] for h in sorted(by_hour)]
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.metrics[name] += n
+
+    def stats(self):
+        with self._lock:
+            metrics = dict(self.metrics)
+        return dict(metrics, sample_rate=self.sample_rate, writer=self.writer.stats())
+
+
+def outcome_rows(collection, batch_size=1000):
+    """Training rows — the slot's feature dict plus effective_minutes —
+    for every slot with a reported outcome, streamed from an
+    aggregation cursor `batch_size` documents at a time."""
+    pipeline = [
+        {"$match": {"kind": "outcome"}},
+        {"$sort": {"created_at": 1}},
+        {"$group": {"_id": "$slot", "minutes": {"$last": "$minutes"}}},
+        {"$lookup": {"from": collection.name, "localField": "_id", "foreignField": "_id", "as": "slot"}},
+        {"$unwind": "$slot"},
+        {"$project": {"_id": 0, "x": "$slot.x", "minutes": 1}},
+    ]
+    for doc in collection.aggregate(pipeline, allowDiskUse=True, batchSize=batch_size):
+        yield dict(doc["x"], effective_minutes=doc["minutes"])
+
+
+USAGE = "usage: python persistence.py migrate | export OUT.parquet|OUT.arrows"
+
+if __name__ == "__main__":
+    import sys
+    args = sys.argv[1:]
+    if args == ["migrate"]:
+        from resources import get_mongo
+        mongo = get_mongo()
+        n = migrate_legacy(mongo.collection("timetables"))
+        named = backfill_names(mongo.collection("timetables"), mongo.collection("users"))
+        SavedTimetables(mongo).ensure_indexes()
+        print(f"Migrated {n} timetables, added the child's name to {named}")
+    elif len(args) == 2 and args[0] == "export":
+        from resources import get_mongo
+        from scheduler.arrow import export_collection
+        out = args[1]
+        fmt = "parquet" if out.endswith(".parquet") else "arrow"
+        n = export_collection(get_mongo().collection("timetables"), out, fmt)
+        print(f"Exported {n} timetables to {out}")
+    else:
+        sys.exit(USAGE)
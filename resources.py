@@ -0,0 +1,255 @@
+# ============================================================
+# resources.py — process-wide model and MongoDB handles
+# ============================================================
+# Streamlit re-executes app.py on every widget interaction. The
+# objects here are created once per process, lazily, on first
+# real use, and shared by all sessions and reruns:
+#
+#   get_model()      ML model (compact export or model.joblib)
+#   get_predictor()  model behind the shared PredictionCache
+#   get_mongo()      pooled MongoClient + cached health state
+#   get_writer()     write-behind queue that persists timetables
+#   get_saved()      indexed, paginated reads for "Show Saved"
+#   get_memo()       generated timetables by input hash (LRU + Mongo)
+#   get_slot_log()   sampled study-slot / outcome log for retraining
+#
+# Nothing here touches the network at import time, and status()
+# never blocks: the Mongo health probe runs in a background thread.
+
+import importlib.util
+import json
+import os
+import threading
+import time
+
+MODEL_PATH   = os.getenv("MODEL_PATH", "model.joblib")
+COMPACT_PATH = os.getenv("MODEL_COMPACT_PATH", "model_compact")
+
+_lock      = threading.Lock()
+_model     = None
+_model_err = None
+_predictor = None
+_mongo     = None
+_writer    = None
+_saved     = None
+_memo      = None
+_slot_log  = None
+
+
+# ============================================================
+# MODEL
+# ============================================================
+def model_available():
+    """Cheap check for the UI: is there a model file to load?"""
+    return os.path.isdir(COMPACT_PATH) or os.path.exists(MODEL_PATH)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def use_compact():
+    """True if get_model() should load the NumPy-only export: it must not
+    be older than model.joblib (otherwise it is a stale forest from an
+    earlier run), and must have been measured faster than the Pipeline
+    at export time (every plan in compact_model.BENCH_PLANS) — unless
+    the Pipeline cannot be loaded at all."""
+    meta = os.path.join(COMPACT_PATH, "meta.json")
+    compact, full = _mtime(meta), _mtime(MODEL_PATH)
+    if compact is None:
+        return False
+    if full is None:
+        return True
+    if compact < full:
+        return False
+    if importlib.util.find_spec("sklearn") is None:
+        return True
+    try:
+        with open(meta) as f:
+            bench = json.load(f).get("bench") or {}
+    except (OSError, ValueError):
+        return False
+    return bool(bench) and all(b["compact_ms"] < b["pipeline_ms"] for b in bench.values())
+
+
+def get_model():
+    """Load the model once per process; None if it cannot be loaded."""
+    global _model, _model_err
+    if _model is None and _model_err is None:
+        with _lock:
+            if _model is None and _model_err is None:
+                try:
+                    # NumPy-only export (train_model.py --compact) when it is
+                    # current and faster: memory-mapped, no scikit-learn import
+                    if use_compact():
+                        from scheduler.compact_model import CompactForest
+                        _model = CompactForest.load(COMPACT_PATH)
+                    else:
+                        from joblib import load
+                        _model = load(MODEL_PATH)
+                except Exception as e:
+                    _model_err = e
+    return _model
+
+
+def model_version():
+    """Identifies the model file get_model() loads (path + mtime), so
+    cached ML results are not reused after retraining; "" if none."""
+    path = os.path.join(COMPACT_PATH, "meta.json") if use_compact() else MODEL_PATH
+    try:
+        return f"{os.path.abspath(path)}@{os.stat(path).st_mtime_ns}"
+    except OSError:
+        return ""
+
+
+def get_predictor():
+    """The model wrapped in the process-wide prediction cache."""
+    global _predictor
+    if _predictor is None:
+        model = get_model()
+        if model is None:
+            return None
+        with _lock:
+            if _predictor is None:
+                from scheduler.predict_cache import PredictionCache
+                _predictor = PredictionCache(model)
+    return _predictor
+
+
+# ============================================================
+# MONGO
+# ============================================================
+class MongoResource:
+    def __init__(self, uri, db_name, timeout_ms=4000, ok_interval=30.0, down_interval=5.0):
+        self.uri           = uri
+        self.db_name       = db_name
+        self.timeout_ms    = timeout_ms
+        self.ok_interval   = ok_interval     # re-probe period while healthy
+        self.down_interval = down_interval   # ... and while down
+        self.ok            = None            # None = not probed yet
+        self.error         = None
+        self.last_probe    = 0.0
+        self._client       = None
+        self._lock         = threading.Lock()
+        self._probing      = None            # in-flight probe thread
+
+    @property
+    def client(self):
+        # MongoClient connects in the background; constructing it is cheap
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from pymongo import MongoClient
+                    self._client = MongoClient(self.uri, serverSelectionTimeoutMS=self.timeout_ms)
+        return self._client
+
+    def collection(self, name):
+        return self.client[self.db_name][name]
+
+    def _probe(self):
+        try:
+            self.client.admin.command("ping")
+            self.ok, self.error = True, None
+        except Exception as e:
+            self.ok, self.error = False, e
+        self.last_probe = time.monotonic()
+
+    def _kick(self):
+        with self._lock:
+            if self._probing is not None and self._probing.is_alive():
+                return self._probing
+            self._probing = threading.Thread(target=self._probe, name="mongo-probe", daemon=True)
+            self._probing.start()
+            return self._probing
+
+    def status(self):
+        """Last known health (True / False / None); never blocks.
+        Starts a background re-probe when the cached state is stale."""
+        interval = self.ok_interval if self.ok else self.down_interval
+        if self.ok is None or time.monotonic() - self.last_probe > interval:
+            self._kick()
+        return self.ok
+
+    def ready(self, timeout=None):
+        """Health for code that is about to use the database: waits for the
+        first probe (at most `timeout` s) if none has finished yet."""
+        if self.ok is None:
+            self._kick().join(timeout)
+        return self.status()
+
+
+def get_mongo():
+    global _mongo
+    if _mongo is None:
+        with _lock:
+            if _mongo is None:
+                from dotenv import load_dotenv
+                load_dotenv()
+                _mongo = MongoResource(
+                    os.getenv("MONGODB_URI", "mongodb://localhost:27017"),
+                    os.getenv("DB_NAME", "timetable_app"),
+                )
+    return _mongo
+
+
+def get_writer():
+    """Background batched writer (persistence.WriteBehindQueue) for get_mongo()."""
+    global _writer
+    if _writer is None:
+        mongo = get_mongo()
+        with _lock:
+            if _writer is None:
+                from persistence import WriteBehindQueue
+                _writer = WriteBehindQueue(
+                    mongo,
+                    batch_size=int(os.getenv("PERSIST_BATCH_SIZE", 100)),
+                    flush_interval=float(os.getenv("PERSIST_FLUSH_INTERVAL", 1.0)),
+                    max_queue=int(os.getenv("PERSIST_MAX_QUEUE", 10_000)),
+                    block_timeout=float(os.getenv("PERSIST_BLOCK_TIMEOUT", 0.0)),
+                )
+    return _writer
+
+
+def get_saved():
+    """Read side for saved timetables (persistence.SavedTimetables)."""
+    global _saved
+    if _saved is None:
+        mongo = get_mongo()
+        with _lock:
+            if _saved is None:
+                from persistence import SavedTimetables
+                _saved = SavedTimetables(mongo)
+    return _saved
+
+
+def get_memo():
+    """Two-tier memo of generated timetables (persistence.TimetableMemo)."""
+    global _memo
+    if _memo is None:
+        saved = get_saved()
+        with _lock:
+            if _memo is None:
+                from persistence import TimetableMemo
+                _memo = TimetableMemo(saved, maxsize=int(os.getenv("MEMO_SIZE", 256)))
+    return _memo
+
+
+def get_slot_log():
+    """Sampled study-slot logger (persistence.SlotLog), on its own
+    write-behind queue so logging never delays timetable saves."""
+    global _slot_log
+    if _slot_log is None:
+        mongo = get_mongo()
+        with _lock:
+            if _slot_log is None:
+                from persistence import SlotLog, WriteBehindQueue
+                _slot_log = SlotLog(
+                    WriteBehindQueue(mongo, batch_size=500, flush_interval=5.0,
+                                     max_queue=int(os.getenv("SLOT_LOG_MAX_QUEUE", 20_000))),
+                    sample_rate=float(os.getenv("SLOT_LOG_RATE", 0.25)),
+                    max_days=int(os.getenv("SLOT_LOG_DAYS", 7)),
+                )
+    return _slot_log
@@ -0,0 +1,17 @@
+# scheduler — Streamlit-free scheduling engine shared by app.py, CLI and batch jobs
+# NumPy-backed modules (scheduler.bulk) are imported explicitly, not re-exported here.
+from .core import (
+    FamilyEvent,
+    Routine,
+    ScheduleRequest,
+    Subject,
+    in_sleep,
+    rule_scheduler,
+    schedule,
+)
+from .timetable import Timetable
+
+__all__ = [
+    "FamilyEvent", "Routine", "ScheduleRequest", "Subject", "Timetable",
+    "in_sleep", "rule_scheduler", "schedule",
+]
@@ -0,0 +1,181 @@
+# ============================================================
+# scheduler/arrow.py — Arrow / Parquet export
+# ============================================================
+# Timetables as typed columns instead of emoji-keyed JSON rows:
+#
+#   date          date32
+#   start_minute  uint16   minute of day the slot starts
+#   minutes       uint16   slot length (60 for hourly plans)
+#   category      dictionary<uint8, string>   free / study / family / routine / break
+#   subject       dictionary<uint16, string>  null unless study
+#   chapters      uint16
+#
+# Bulk dumps add timetable_id / user_id and stream documents from
+# a Mongo cursor, one record batch (= one Parquet row group) per
+# `batch_size` timetables. pyarrow / NumPy are imported here only.
+
+from __future__ import annotations
+
+from datetime import date
+from typing import BinaryIO, Iterable, Optional, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .timetable import NO_SUBJECT, IntervalTimetable, Timetable
+
+CATEGORY_NAMES = ("free", "study", "family", "routine", "break")   # index = category code
+_CATEGORIES    = pa.array(CATEGORY_NAMES, pa.string())
+_EPOCH         = date(1970, 1, 1).toordinal()
+_CATEGORY      = pa.dictionary(pa.uint8(), pa.string())
+_SUBJECT       = pa.dictionary(pa.uint16(), pa.string())
+
+TIMETABLE_SCHEMA = pa.schema([
+    ("date",         pa.date32()),
+    ("start_minute", pa.uint16()),
+    ("minutes",      pa.uint16()),
+    ("category",     _CATEGORY),
+    ("subject",      _SUBJECT),
+    ("chapters",     pa.uint16()),
+])
+_IDS = pa.dictionary(pa.int32(), pa.string())
+BULK_SCHEMA = pa.schema([("timetable_id", _IDS), ("user_id", _IDS)] + list(TIMETABLE_SCHEMA))
+
+Sink = Union[str, BinaryIO]
+
+
+def _columns(tt: Timetable, subject_ids: Optional[np.ndarray] = None) -> dict:
+    """NumPy columns for one timetable; `subject_ids` remaps local subject
+    ids onto a shared dictionary (bulk dumps)."""
+    day = np.frombuffer(tt.day, np.uint16) if len(tt) else np.zeros(0, np.uint16)
+    if isinstance(tt, IntervalTimetable):
+        start   = np.array(tt.start, np.uint16)
+        minutes = np.array(tt.length, np.uint16)
+    else:
+        start   = np.array(tt.hour, np.uint16) * np.uint16(60)
+        minutes = np.full(len(tt), 60, np.uint16)
+    subject = np.array(tt.subject, np.uint16)
+    missing = subject == NO_SUBJECT
+    if subject_ids is not None and len(subject_ids):
+        subject = np.where(missing, 0, subject_ids[np.minimum(subject, len(subject_ids) - 1)]).astype(np.uint16)
+    return {
+        "date":         day.astype(np.int32) + (tt.start_date.toordinal() - _EPOCH),
+        "start_minute": start,
+        "minutes":      minutes,
+        "category":     np.array(tt.category, np.uint8),
+        "subject":      subject,
+        "missing":      missing,
+        "chapters":     np.array(tt.chapters, np.uint16),
+    }
+
+
+def _batch(cols: dict, subjects: Iterable[str], ids: Optional[dict] = None) -> pa.RecordBatch:
+    arrays = [
+        pa.array(cols["date"], pa.int32()).cast(pa.date32()),
+        pa.array(cols["start_minute"], pa.uint16()),
+        pa.array(cols["minutes"], pa.uint16()),
+        pa.DictionaryArray.from_arrays(pa.array(cols["category"], pa.uint8()), _CATEGORIES),
+        pa.DictionaryArray.from_arrays(
+            pa.array(cols["subject"], pa.uint16(), mask=cols["missing"]),
+            pa.array(list(subjects), pa.string())),
+        pa.array(cols["chapters"], pa.uint16()),
+    ]
+    schema = TIMETABLE_SCHEMA
+    if ids is not None:
+        arrays = [ids["timetable_id"], ids["user_id"]] + arrays
+        schema = BULK_SCHEMA
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def to_arrow(tt: Timetable) -> pa.Table:
+    return pa.Table.from_batches([_batch(_columns(tt), tt.subjects)], TIMETABLE_SCHEMA)
+
+
+def write_parquet(tt: Timetable, sink: Sink, compression: str = "zstd") -> None:
+    pq.write_table(to_arrow(tt), sink, compression=compression)
+
+
+def _ipc_options(compression: Optional[str]) -> pa.ipc.IpcWriteOptions:
+    return pa.ipc.IpcWriteOptions(compression=compression)
+
+
+def write_ipc(tt: Timetable, sink: Sink, compression: Optional[str] = "zstd") -> None:
+    """Arrow IPC file (Feather v2)."""
+    with pa.ipc.new_file(sink, TIMETABLE_SCHEMA, options=_ipc_options(compression)) as w:
+        w.write_table(to_arrow(tt))
+
+
+def to_bytes(tt: Timetable, fmt: str = "parquet") -> bytes:
+    buf = pa.BufferOutputStream()
+    (write_parquet if fmt == "parquet" else write_ipc)(tt, buf)
+    return buf.getvalue().to_pybytes()
+
+
+# ============================================================
+# BULK — stream a Mongo cursor into one file
+# ============================================================
+class _BulkBuilder:
+    """Accumulates timetables for one record batch. Subject names share one
+    dictionary for the whole dump (it only grows), so ids stay comparable
+    across row groups."""
+
+    def __init__(self):
+        self.subjects: dict[str, int] = {}
+        self._reset()
+
+    def _reset(self):
+        self.parts, self.tids, self.uids, self.lengths = [], [], [], []
+
+    def __len__(self) -> int:
+        return len(self.parts)
+
+    def add(self, tt: Timetable, timetable_id: str, user_id: Optional[str]) -> None:
+        ids = np.array([self.subjects.setdefault(s, len(self.subjects)) for s in tt.subjects], np.uint16)
+        self.parts.append(_columns(tt, ids))
+        self.tids.append(timetable_id)
+        self.uids.append(user_id)
+        self.lengths.append(len(tt))
+
+    def batch(self) -> pa.RecordBatch:
+        cols = {k: np.concatenate([p[k] for p in self.parts]) for k in self.parts[0]}
+        # one dictionary entry per timetable, indices repeated per row;
+        # Parquet cannot store nulls inside a dictionary, so a missing
+        # user_id is a null index instead
+        rows   = np.repeat(np.arange(len(self.lengths), dtype=np.int32), self.lengths)
+        no_uid = np.repeat(np.array([u is None for u in self.uids]), self.lengths)
+        ids = {
+            "timetable_id": pa.DictionaryArray.from_arrays(pa.array(rows), pa.array(self.tids, pa.string())),
+            "user_id":      pa.DictionaryArray.from_arrays(
+                pa.array(rows, mask=no_uid), pa.array([u or "" for u in self.uids], pa.string())),
+        }
+        out = _batch(cols, self.subjects, ids)
+        self._reset()
+        return out
+
+
+def export_collection(collection, sink: Sink, fmt: str = "parquet", query: Optional[dict] = None,
+                      batch_size: int = 500, compression: str = "zstd") -> int:
+    """Dump every timetable matching `query` to Parquet, or to an Arrow IPC
+    stream with fmt="arrow" (dictionaries change between batches, which the
+    IPC file format does not allow). Reads the cursor in batches; returns
+    the number of documents written."""
+    from .codec import timetable_from_doc
+
+    cursor = collection.find(query or {}, {"tt": 1, "timetable": 1, "user_id": 1}, batch_size=batch_size)
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, BULK_SCHEMA, compression=compression)
+    else:
+        writer = pa.ipc.new_stream(sink, BULK_SCHEMA, options=_ipc_options(compression))
+    builder, n = _BulkBuilder(), 0
+    try:
+        for doc in cursor:
+            builder.add(timetable_from_doc(doc), str(doc["_id"]), doc.get("user_id"))
+            n += 1
+            if len(builder) >= batch_size:
+                writer.write_batch(builder.batch())
+        if len(builder):
+            writer.write_batch(builder.batch())
+    finally:
+        writer.close()
+    return n
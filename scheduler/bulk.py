@@ -0,0 +1,179 @@
+# ============================================================
+# scheduler/bulk.py — vectorized scheduler for whole cohorts
+# ============================================================
+# Same rules as core.schedule(), but computed for N children at
+# once as an (N, days, hours) grid with NumPy masks instead of a
+# per-child, per-hour Python loop. NumPy is imported here only,
+# so `import scheduler` stays light for single-child callers.
+
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import date
+from typing import Sequence
+
+import numpy as np
+
+from .core import DAY_END, DAY_START, FAMILY_START, MINUTES_PER_DAY, STUDY_REDUCTION, ScheduleRequest
+from .timetable import CAT_FAMILY, CAT_FREE, CAT_ROUTINE, CAT_STUDY, NO_SUBJECT, Timetable
+
+SLOT_NONE = 255      # sleeping, or past the child's horizon
+HOURS     = np.arange(DAY_START, DAY_END)
+CHUNK     = 2048     # children per NumPy pass; bounds peak memory
+
+
+class CohortTimetable:
+    """Dense (child, day, hour) grids for a cohort; hour index 0 is DAY_START."""
+
+    def __init__(self, requests, start_dates, family_by_day, category, subject, chapters):
+        self.requests      = requests
+        self.start_dates   = start_dates
+        self.family_by_day = family_by_day
+        self.category      = category     # uint8 (N, D, H), SLOT_NONE where unscheduled
+        self.subject       = subject      # uint8 (N, D, H), NO_SUBJECT unless study
+        self.chapters      = chapters     # uint16 (N, D, H)
+        self.study_slots   = (category == CAT_STUDY).sum(axis=(1, 2))
+        self.family_slots  = (category == CAT_FAMILY).sum(axis=(1, 2))
+        self.total_slots   = (category != SLOT_NONE).sum(axis=(1, 2))
+
+    def __len__(self) -> int:
+        return len(self.requests)
+
+    def timetable(self, i: int) -> Timetable:
+        """Child i's schedule as the regular columnar Timetable."""
+        cat = self.category[i]
+        d, h = np.nonzero(cat != SLOT_NONE)
+        return Timetable.from_columns(
+            self.start_dates[i],
+            tuple(s.name for s in self.requests[i].subjects),
+            self.family_by_day[i],
+            d.astype(np.uint16).tobytes(),
+            (h + DAY_START).astype(np.uint8).tobytes(),
+            cat[d, h].tobytes(),
+            self.subject[i][d, h].tobytes(),
+            self.chapters[i][d, h].tobytes(),
+        )
+
+
+# ============================================================
+# PER-CHILD PARAMETERS -> ARRAYS
+# ============================================================
+def _awake_mask(sleep_start, sleep_hours):
+    # same minute-level overlap test as core.in_sleep
+    start = (HOURS[None, :] * 60 - sleep_start[:, None] * 60) % MINUTES_PER_DAY
+    dur   = np.round(sleep_hours * 60)[:, None]
+    asleep = (start < dur) | (MINUTES_PER_DAY - start < 60)
+    return ~asleep
+
+
+def _study_sequence(chap, n_subj, k_max):
+    """Subject / chapter label for the k-th study slot of any day.
+
+    core.schedule() re-sorts the subject list every day, so the order in
+    which subjects are studied is the same each day: the most-chaptered
+    subject first (stable on ties), each for max(chapters, 1) slots."""
+    n, s_max = chap.shape
+    real = np.arange(s_max)[None, :] < n_subj[:, None]
+    key  = np.where(real, -chap.astype(np.float64), np.inf)
+    order = np.argsort(key, axis=1, kind="stable")
+    c_sorted = np.take_along_axis(chap, order, axis=1)
+    eff  = np.where(np.take_along_axis(real, order, axis=1), np.maximum(c_sorted, 1), 0)
+    csum = np.cumsum(eff, axis=1)
+    total = csum[:, -1]
+
+    k = np.arange(k_max)
+    j = (csum[:, None, :] <= k[None, :, None]).sum(axis=2)          # (N, K)
+    jc = np.minimum(j, max(s_max - 1, 0))
+    start = np.take_along_axis(csum, jc, axis=1) - np.take_along_axis(eff, jc, axis=1)
+    seq_subj = np.take_along_axis(order, jc, axis=1)
+    seq_chap = np.take_along_axis(c_sorted, jc, axis=1) - (k[None, :] - start)
+    return seq_subj, seq_chap, total
+
+
+def _chunk_grid(reqs, n_days):
+    n = len(reqs)
+    s_max = max((len(r.subjects) for r in reqs), default=0)
+
+    sleep_start = np.fromiter((r.sleep_start for r in reqs), np.int64, n)
+    sleep_hours = np.fromiter((r.sleep_hours for r in reqs), np.float64, n)
+    days        = np.fromiter((r.days_remaining for r in reqs), np.int64, n)
+    max_study   = np.fromiter((r.max_daily_study for r in reqs), np.int64, n)
+    n_subj      = np.fromiter((len(r.subjects) for r in reqs), np.int64, n)
+    chap = np.zeros((n, max(s_max, 1)), dtype=np.int64)
+    routine_hours = np.zeros((n, len(HOURS)), dtype=bool)
+    for i, r in enumerate(reqs):
+        chap[i, :len(r.subjects)] = [s.chapters_remaining for s in r.subjects]
+        for hr in r.routine.slots():
+            routine_hours[i, hr - DAY_START] = True
+
+    # family events -> (N, D) hours and study caps
+    fam_hours = np.zeros((n, n_days), dtype=np.int64)
+    study_cap = np.repeat(max_study[:, None], n_days, axis=1)
+    fam_by_day = []
+    for i, r in enumerate(reqs):
+        start = r.start_date
+        by_day = {}
+        for ds, ev in r.family_events.items():
+            off = (date.fromisoformat(ds) - start).days
+            if 0 <= off < r.days_remaining:
+                by_day[off] = ev
+                fam_hours[i, off] = ev.hours
+                study_cap[i, off] = max(1, int(r.max_daily_study * STUDY_REDUCTION[ev.impact]))
+        fam_by_day.append(by_day)
+
+    awake = _awake_mask(sleep_start, sleep_hours)                    # (N, H)
+    valid = np.arange(n_days)[None, :] < days[:, None]               # (N, D)
+    awake3 = awake[:, None, :] & valid[:, :, None]                   # (N, D, H)
+
+    # family block: first fam_hours awake hours from 15:00
+    fam_elig = awake & (HOURS >= FAMILY_START)[None, :]
+    fam_rank = np.cumsum(fam_elig, axis=1)
+    family = fam_elig[:, None, :] & (fam_rank[:, None, :] <= fam_hours[:, :, None]) & valid[:, :, None]
+
+    routine = awake3 & ~family & routine_hours[:, None, :]
+    cand    = awake3 & ~family & ~routine_hours[:, None, :]
+
+    k_max = int(min(max(study_cap.max(initial=1), 1), len(HOURS)))
+    seq_subj, seq_chap, total = _study_sequence(chap[:, :max(s_max, 1)], n_subj, k_max)
+    krank = np.cumsum(cand, axis=2, dtype=np.int16) - 1
+    study = cand & (krank < study_cap[:, :, None]) & (krank < total[:, None, None])
+
+    kc = np.clip(krank, 0, k_max - 1).reshape(n, -1)
+    subj_g = np.take_along_axis(seq_subj, kc, axis=1).reshape(krank.shape)
+    chap_g = np.take_along_axis(seq_chap, kc, axis=1).reshape(krank.shape)
+
+    category = np.full(awake3.shape, SLOT_NONE, dtype=np.uint8)
+    category[cand]    = CAT_FREE
+    category[study]   = CAT_STUDY
+    category[routine] = CAT_ROUTINE
+    category[family]  = CAT_FAMILY
+    subject  = np.where(study, subj_g, NO_SUBJECT).astype(np.uint8)
+    chapters = np.where(study, chap_g, 0).astype(np.uint16)
+    return fam_by_day, category, subject, chapters
+
+
+# ============================================================
+# PUBLIC API
+# ============================================================
+def schedule_cohort(requests: Sequence[ScheduleRequest]) -> CohortTimetable:
+    """Schedule many children at once; child i matches core.schedule(requests[i])."""
+    if any(r.carry_over for r in requests):
+        raise ValueError("schedule_cohort does not support carry_over requests")
+    today = date.today()
+    reqs  = [r if r.start_date else replace(r, start_date=today) for r in requests]
+    n_days = max((r.days_remaining for r in reqs), default=0)
+
+    n_hours  = len(HOURS)
+    category = np.empty((len(reqs), n_days, n_hours), dtype=np.uint8)
+    subject  = np.empty_like(category)
+    chapters = np.empty((len(reqs), n_days, n_hours), dtype=np.uint16)
+    fam_by_day = []
+    for lo in range(0, len(reqs), CHUNK):
+        hi = min(lo + CHUNK, len(reqs))
+        fam, c, s, ch = _chunk_grid(reqs[lo:hi], n_days)
+        fam_by_day.extend(fam)
+        category[lo:hi], subject[lo:hi], chapters[lo:hi] = c, s, ch
+
+    return CohortTimetable(reqs, [r.start_date for r in reqs], fam_by_day,
+                           category, subject, chapters)
+
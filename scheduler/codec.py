@@ -0,0 +1,137 @@
+# ============================================================
+# scheduler/codec.py — compact storage format for timetables
+# ============================================================
+# Saved documents hold the Timetable columns as one zlib'd blob
+# instead of ~15 verbose emoji-keyed rows per day:
+#
+#   {"v": 1,                       codec version
+#    "s": "2026-01-31",            start date (day offset 0)
+#    "n": ["Maths", ...],          subject dictionary (id -> name)
+#    "f": {"3": ["high", 4]},      family events by day offset
+#    "c": [total, study, family],  stat badge counters
+#    "b": <bytes>,                 zlib(day u16 | hour u8 | category u8 | subject u8 | chapters u16), little-endian
+#    "i": <bytes>}                 minute-level plans only: zlib(start u16 | length u16)
+#
+# from_rows() parses the legacy list-of-rows format back into a
+# Timetable so old documents can be read and migrated.
+
+from __future__ import annotations
+
+import re
+import sys
+import zlib
+from array import array
+from datetime import date
+
+from .core import FamilyEvent
+from .timetable import (
+    CAT_FAMILY,
+    CAT_FREE,
+    CAT_ROUTINE,
+    CAT_STUDY,
+    FAMILY_LABEL,
+    FREE_LABEL,
+    NO_SUBJECT,
+    ROUTINE_SLOTS,
+    IntervalTimetable,
+    Timetable,
+)
+
+VERSION = 1
+_COLUMNS = (("day", "H"), ("hour", "B"), ("category", "B"), ("subject", "B"), ("chapters", "H"))
+_INTERVAL_COLUMNS = (("start", "H"), ("length", "H"))
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _pack(tt: Timetable, columns) -> bytes:
+    parts = []
+    for name, _ in columns:
+        col = getattr(tt, name)
+        if _BIG_ENDIAN and col.itemsize > 1:
+            col = array(col.typecode, col)
+            col.byteswap()
+        parts.append(col.tobytes())
+    return zlib.compress(b"".join(parts))
+
+
+def _unpack(tt: Timetable, columns, blob: bytes) -> None:
+    raw = zlib.decompress(blob)
+    n = len(raw) // sum(array(t).itemsize for _, t in columns)
+    pos = 0
+    for name, typecode in columns:
+        col = getattr(tt, name)
+        size = n * col.itemsize
+        col.frombytes(raw[pos:pos + size])
+        if _BIG_ENDIAN and col.itemsize > 1:
+            col.byteswap()
+        pos += size
+
+
+def encode(tt: Timetable) -> dict:
+    doc = {
+        "v": VERSION,
+        "s": tt.start_date.isoformat(),
+        "n": list(tt.subjects),
+        "f": {str(d): [ev.impact, ev.hours] for d, ev in tt.family_events.items()},
+        "c": [tt.total_slots, tt.study_slots, tt.family_slots],
+        "b": _pack(tt, _COLUMNS),
+    }
+    if isinstance(tt, IntervalTimetable):
+        doc["i"] = _pack(tt, _INTERVAL_COLUMNS)
+    return doc
+
+
+def decode(doc: dict) -> Timetable:
+    if doc.get("v") != VERSION:
+        raise ValueError(f"unsupported timetable codec version: {doc.get('v')!r}")
+    cls = IntervalTimetable if "i" in doc else Timetable
+    tt = cls(date.fromisoformat(doc["s"]), tuple(doc["n"]),
+             {int(d): FamilyEvent(imp, hrs) for d, (imp, hrs) in doc["f"].items()})
+    _unpack(tt, _COLUMNS, doc["b"])
+    if "i" in doc:
+        _unpack(tt, _INTERVAL_COLUMNS, doc["i"])
+    tt.counts = [tt.category.count(c) for c in range(len(tt.counts))]
+    return tt
+
+
+# ============================================================
+# LEGACY ROWS
+# ============================================================
+_ROUTINE_LABELS = {label for _, label in ROUTINE_SLOTS.values()}
+_STUDY_TASK  = re.compile(r"Study — Ch\. remaining: (-?\d+)")
+_FAMILY_TASK = re.compile(r"Family Time · (\w+) impact · (\d+)h total")
+
+
+def from_rows(rows: list[dict]) -> Timetable:
+    """Rebuild a Timetable from the old emoji-keyed row dicts."""
+    if not rows:
+        return Timetable(date.today(), ())
+    start = date.fromisoformat(rows[0]["📅 Date"])
+    subjects, family, cells = {}, {}, []
+    for r in rows:
+        day  = (date.fromisoformat(r["📅 Date"]) - start).days
+        hour = int(r["🕐 Time"].split(":", 1)[0])
+        subj, task = r["📚 Subject"], r["📋 Task"]
+        if subj == FAMILY_LABEL:
+            m = _FAMILY_TASK.match(task)
+            family[day] = FamilyEvent(m.group(1), int(m.group(2)))
+            cells.append((day, hour, CAT_FAMILY, NO_SUBJECT, 0))
+        elif subj == FREE_LABEL:
+            cells.append((day, hour, CAT_FREE, NO_SUBJECT, 0))
+        elif task == "Routine" and subj in _ROUTINE_LABELS:
+            cells.append((day, hour, CAT_ROUTINE, NO_SUBJECT, 0))
+        else:
+            sid = subjects.setdefault(subj, len(subjects))
+            m = _STUDY_TASK.match(task)
+            cells.append((day, hour, CAT_STUDY, sid, max(int(m.group(1)), 0) if m else 0))
+    tt = Timetable(start, tuple(subjects), family)
+    for cell in cells:
+        tt.append(*cell)
+    return tt
+
+
+def timetable_from_doc(doc: dict) -> Timetable:
+    """Timetable from a saved Mongo document in either format."""
+    if "tt" in doc:
+        return decode(doc["tt"])
+    return from_rows(doc.get("timetable", []))
@@ -0,0 +1,201 @@
+# ============================================================
+# scheduler/compact_model.py — NumPy-only RandomForest predictor
+# ============================================================
+# train_model.py can export the fitted Pipeline (StandardScaler +
+# OneHotEncoder + RandomForestRegressor) as a directory of flat
+# .npy node arrays plus a small meta.json. CompactForest loads
+# them memory-mapped, so app / worker processes share the pages
+# and never import scikit-learn.
+#
+# NumPy tree walks cannot match scikit-learn's compiled ones on deep
+# forests, so the export also times both predictors on a typical and
+# on the largest ML plan the app allows, and records the result in
+# meta.json; resources.get_model() only prefers the compact model
+# when it was measured faster on both (or scikit-learn is not there).
+#
+#   python -m scheduler.compact_model model.joblib model_compact
+
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import numpy as np
+
+from .ml import FEATURES
+
+NODE_ARRAYS = ("feature", "threshold", "left", "right", "value")
+
+SHALLOW_DEPTH = 12     # up to this depth, walk tree by tree over all rows at once
+
+
+# ============================================================
+# EXPORT (needs the fitted sklearn pipeline, not sklearn itself)
+# ============================================================
+def export_compact(pipeline, out_dir: str) -> None:
+    prep   = pipeline.named_steps["prep"]
+    forest = pipeline.named_steps["rf"]
+    scaler = prep.named_transformers_["num"]
+    onehot = prep.named_transformers_["cat"]
+    num_cols = next(cols for name, _, cols in prep.transformers_ if name == "num")
+    cat_cols = next(cols for name, _, cols in prep.transformers_ if name == "cat")
+
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    base = 0
+    for est in forest.estimators_:
+        t = est.tree_
+        n = t.node_count
+        leaf = t.children_left == -1
+        roots.append(base)
+        feature.append(np.where(leaf, -1, t.feature).astype(np.int16))   # -1 marks a leaf
+        threshold.append(np.where(leaf, 0.0, t.threshold))
+        left.append(np.where(leaf, -1, t.children_left + base).astype(np.int32))
+        right.append(np.where(leaf, -1, t.children_right + base).astype(np.int32))
+        value.append(t.value[:, 0, 0].astype(np.float64))
+        base += n
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name, parts in zip(NODE_ARRAYS, (feature, threshold, left, right, value)):
+        np.save(os.path.join(out_dir, f"{name}.npy"), np.concatenate(parts))
+    meta = {
+        "num_cols":   list(num_cols),
+        "mean":       scaler.mean_.tolist(),
+        "scale":      scaler.scale_.tolist(),
+        "cat_cols":   list(cat_cols),
+        "categories": [c.tolist() for c in onehot.categories_],
+        "roots":      roots,
+        "depth":      max(est.tree_.max_depth for est in forest.estimators_),
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    meta["bench"] = benchmark(pipeline, CompactForest.load(out_dir))
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+
+BENCH_PLANS = {"typical": (3, 30), "largest": (10, 120)}   # subjects, days
+
+
+def benchmark(pipeline, compact, repeat=3) -> dict:
+    """Best-of-`repeat` milliseconds per predictor for the candidate
+    slots of each BENCH_PLANS plan."""
+    from datetime import date
+    from .core import MAX_DAYS, ScheduleRequest, Subject, day_skeleton
+    from .ml import feature_rows, model_predict
+    out = {}
+    for plan, (n_subj, days) in BENCH_PLANS.items():
+        req  = ScheduleRequest(subjects=tuple(Subject(f"S{i}", 6) for i in range(n_subj)),
+                               days_remaining=min(days, MAX_DAYS), start_date=date(2026, 1, 5))
+        cols = feature_rows(req, day_skeleton(req))
+        res  = out[plan] = {"rows": len(cols["age"])}
+        for name, model in (("pipeline_ms", pipeline), ("compact_ms", compact)):
+            model_predict(model, cols)
+            best = float("inf")
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                model_predict(model, cols)
+                best = min(best, time.perf_counter() - t0)
+            res[name] = round(best * 1000, 2)
+    return out
+
+
+# ============================================================
+# PREDICTOR
+# ============================================================
+class CompactForest:
+    def __init__(self, meta: dict, arrays: dict):
+        self.num_cols   = meta["num_cols"]
+        self.mean       = np.asarray(meta["mean"])
+        self.scale      = np.asarray(meta["scale"])
+        self.cat_cols   = meta["cat_cols"]
+        self.cat_index  = [{v: i for i, v in enumerate(c)} for c in meta["categories"]]
+        self.n_cat      = sum(len(c) for c in meta["categories"])
+        self.roots      = np.asarray(meta["roots"], dtype=np.int32)
+        self.feature    = arrays["feature"]
+        self.threshold  = arrays["threshold"]
+        self.left       = arrays["left"]
+        self.right      = arrays["right"]
+        self.value      = arrays["value"]
+        self.bench      = meta.get("bench")
+        self.depth      = meta.get("depth")
+        if self.depth is not None and self.depth <= SHALLOW_DEPTH:
+            # leaves loop to themselves, so every row can take exactly
+            # `depth` steps; small arrays, built once per process
+            leaf = self.feature < 0
+            own  = np.arange(len(leaf), dtype=np.int32)
+            self._children  = np.stack([np.where(leaf, own, self.left),
+                                        np.where(leaf, own, self.right)], axis=1)
+            self._split     = np.where(leaf, 0, self.feature).astype(np.intp)
+            self._threshold = np.where(leaf, np.inf, self.threshold)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "CompactForest":
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+                  for name in NODE_ARRAYS}
+        return cls(meta, arrays)
+
+    def transform(self, cols) -> np.ndarray:
+        """Same matrix the Pipeline's ColumnTransformer produces."""
+        n = len(cols[self.num_cols[0]])
+        X = np.zeros((n, len(self.num_cols) + self.n_cat))
+        for j, c in enumerate(self.num_cols):
+            X[:, j] = (np.asarray(cols[c], dtype=np.float64) - self.mean[j]) / self.scale[j]
+        off = len(self.num_cols)
+        rows = np.arange(n)
+        for c, index in zip(self.cat_cols, self.cat_index):
+            pos = np.fromiter((index.get(v, -1) for v in cols[c]), np.int64, n)
+            known = pos >= 0                      # unknown categories -> all zeros
+            X[rows[known], off + pos[known]] = 1.0
+            off += len(index)
+        # the trees were fitted on float32 inputs
+        return X.astype(np.float32).astype(np.float64)
+
+    def predict_columns(self, cols) -> np.ndarray:
+        X = self.transform(cols)
+        if self.depth is not None and self.depth <= SHALLOW_DEPTH:
+            return self._predict_shallow(X)
+        n, n_feat = X.shape
+        n_trees = len(self.roots)
+        X = X.ravel()
+
+        # walk every (row, tree) pair down together; pairs drop out of
+        # `active` as soon as they reach a leaf
+        nodes  = np.tile(self.roots, n)
+        offset = np.repeat(np.arange(n) * n_feat, n_trees)
+        active = np.arange(n * n_trees)
+        while active.size:
+            nd = nodes[active]
+            f  = self.feature[nd]
+            inner = f >= 0
+            active, nd, f = active[inner], nd[inner], f[inner]
+            go_left = X[offset[active] + f] <= self.threshold[nd]
+            nodes[active] = np.where(go_left, self.left[nd], self.right[nd])
+        return self.value[nodes].reshape(n, n_trees).mean(axis=1)
+
+    def _predict_shallow(self, X) -> np.ndarray:
+        # one tree at a time, all rows in lockstep, `depth` steps each
+        rows = np.arange(len(X))
+        out  = np.zeros(len(X))
+        for root in self.roots:
+            nodes = np.full(len(X), root, dtype=np.intp)
+            for _ in range(self.depth):
+                right = X[rows, self._split[nodes]] > self._threshold[nodes]
+                nodes = self._children[nodes, right.view(np.int8)]
+            out += self.value[nodes]
+        return out / len(self.roots)
+
+    def predict(self, X) -> np.ndarray:
+        """DataFrame / mapping input, like Pipeline.predict."""
+        return self.predict_columns({c: list(X[c]) for c in FEATURES})
+
+
+if __name__ == "__main__":
+    import sys
+    from joblib import load
+    src = sys.argv[1] if len(sys.argv) > 1 else "model.joblib"
+    dst = sys.argv[2] if len(sys.argv) > 2 else "model_compact"
+    export_compact(load(src), dst)
+    print(f"Saved {dst}/")
@@ -0,0 +1,336 @@
+# ============================================================
+# scheduler/core.py — rule-based timetable engine
+# ============================================================
+# Pure Python on purpose: no Streamlit / pymongo / pandas imports
+# here, so app.py, the CLI and batch workers can all import the
+# scheduler without paying UI or database startup.
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from heapq import heapify, heappop
+from typing import Iterator, Mapping, Optional
+
+from .timetable import (
+    CAT_FAMILY,
+    CAT_FREE,
+    CAT_ROUTINE,
+    CAT_STUDY,
+    ROUTINE_SLOTS,
+    Timetable,
+)
+
+MINUTES_PER_DAY = 24 * 60
+
+DAY_START    = 7     # first schedulable hour
+DAY_END      = 22    # scheduling stops before this hour
+FAMILY_START = 15    # family event block starts at 15:00
+
+STUDY_REDUCTION = {"low": 0.8, "medium": 0.6, "high": 0.3}
+
+# accepted input ranges (the app's widget ranges, a little wider where
+# API clients have a use for it); see ScheduleRequest.validate
+MAX_DAYS     = 120
+MAX_SUBJECTS = 10
+MAX_CHAPTERS = 100
+MAX_HOURS    = 12    # family-event hours, study hours per day
+START_RANGE  = (date(2000, 1, 1), date(2099, 12, 31))
+
+
+# ============================================================
+# INPUT TYPES
+# ============================================================
+@dataclass(frozen=True)
+class Subject:
+    name: str
+    chapters_remaining: int
+    difficulty: str = "medium"
+
+
+@dataclass(frozen=True)
+class FamilyEvent:
+    impact: str = "medium"   # "low" | "medium" | "high"
+    hours: int = 3
+
+
+@dataclass(frozen=True)
+class Routine:
+    breakfast: bool = True
+    lunch: bool = True
+    nap: bool = True
+    games: bool = True
+    relax: bool = True
+    dinner: bool = True
+
+    def slots(self) -> dict[int, str]:
+        """Enabled routine slots as {hour: label}."""
+        return {h: label for h, (flag, label) in ROUTINE_SLOTS.items() if getattr(self, flag)}
+
+
+@dataclass(frozen=True)
+class ScheduleRequest:
+    subjects: tuple[Subject, ...]
+    days_remaining: int
+    sleep_start: int = 20
+    sleep_hours: float = 8.0
+    max_daily_study: int = 4
+    routine: Routine = field(default_factory=Routine)
+    family_events: Mapping[str, FamilyEvent] = field(default_factory=dict)  # keyed "YYYY-MM-DD"
+    start_date: Optional[date] = None   # None -> today
+    # False: every day starts from the full chapter counts (original behaviour)
+    # True:  chapters studied on one day stay done on the following days
+    carry_over: bool = False
+    # child profile; only read by the ML-guided mode (scheduler.ml)
+    age: int = 10
+    grade: int = 5
+    attention_span: float = 1.0
+
+    @classmethod
+    def from_dict(cls, d: Mapping) -> "ScheduleRequest":
+        """Build a request from plain JSON-style data (CLI / API payloads)."""
+        subjects = d.get("subjects", [])
+        if isinstance(subjects, Mapping):   # {"Maths": 4, ...}
+            subjects = [{"name": k, "chapters_remaining": v} for k, v in subjects.items()]
+        start = d.get("start_date")
+        return cls(
+            subjects=tuple(
+                s if isinstance(s, Subject) else Subject(
+                    s["name"], int(s.get("chapters_remaining", 4)), s.get("difficulty", "medium"))
+                for s in subjects
+            ),
+            days_remaining=int(d.get("days_remaining", 14)),
+            sleep_start=int(d.get("sleep_start", 20)),
+            sleep_hours=float(d.get("sleep_hours", 8.0)),
+            max_daily_study=int(d.get("max_daily_study", 4)),
+            routine=Routine(**d.get("routine", {})),
+            family_events={
+                ds: ev if isinstance(ev, FamilyEvent) else FamilyEvent(ev.get("impact", "medium"), int(ev.get("hours", 3)))
+                for ds, ev in d.get("family_events", {}).items()
+            },
+            start_date=date.fromisoformat(start) if isinstance(start, str) else start,
+            carry_over=bool(d.get("carry_over", False)),
+            age=int(d.get("age", 10)),
+            grade=int(d.get("grade", 5)),
+            attention_span=float(d.get("attention_span", 1.0)),
+        )
+
+    def validate(self) -> "ScheduleRequest":
+        """Raise ValueError unless every field is in range; for untrusted
+        input (API, batch files), before the request is hashed or scheduled."""
+        if not 1 <= self.days_remaining <= MAX_DAYS:
+            raise ValueError(f"days_remaining must be 1-{MAX_DAYS}")
+        if not 1 <= len(self.subjects) <= MAX_SUBJECTS:
+            raise ValueError(f"need 1-{MAX_SUBJECTS} subjects")
+        names = [s.name for s in self.subjects]
+        if not all(isinstance(n, str) and n for n in names) or len(set(names)) != len(names):
+            raise ValueError("subject names must be unique, non-empty strings")
+        if not all(0 <= s.chapters_remaining <= MAX_CHAPTERS for s in self.subjects):
+            raise ValueError(f"chapters_remaining must be 0-{MAX_CHAPTERS}")
+        if not 0 <= self.sleep_start <= 23:
+            raise ValueError("sleep_start must be an hour 0-23")
+        if not 0 <= self.sleep_hours <= 16:
+            raise ValueError("sleep_hours must be 0-16")
+        if not 1 <= self.max_daily_study <= MAX_HOURS:
+            raise ValueError(f"max_daily_study must be 1-{MAX_HOURS}")
+        for ds, ev in self.family_events.items():
+            date.fromisoformat(ds)              # ValueError / TypeError if not a date
+            if ev.impact not in STUDY_REDUCTION:
+                raise ValueError(f"impact must be one of {', '.join(STUDY_REDUCTION)}")
+            if not 1 <= ev.hours <= MAX_HOURS:
+                raise ValueError(f"family event hours must be 1-{MAX_HOURS}")
+        if not 0 < self.attention_span <= 5:
+            raise ValueError("attention_span must be in (0, 5]")
+        if self.start_date is not None:
+            if not isinstance(self.start_date, date):
+                raise TypeError("start_date must be a YYYY-MM-DD string")
+            if not START_RANGE[0] <= self.start_date <= START_RANGE[1]:
+                raise ValueError(f"start_date must be {START_RANGE[0]} to {START_RANGE[1]}")
+        return self
+
+
+# ============================================================
+# ENGINE
+# ============================================================
+def in_sleep(hour, s_start, s_hours):
+    """True if any minute of [hour:00, hour+1:00) falls in the sleep window
+    starting at s_start:00 and lasting s_hours (half hours count)."""
+    start = (hour * 60 - s_start * 60) % MINUTES_PER_DAY   # hour start, relative to bedtime
+    dur   = round(s_hours * 60)
+    return start < dur or MINUTES_PER_DAY - start < 60
+
+
+# ============================================================
+# DAY TEMPLATES
+# ============================================================
+# Sleep window and routine toggles are the same every day, so the
+# fixed part of a day is computed once per configuration and only
+# the family block and study allocation are laid over it per day.
+@dataclass(frozen=True)
+class DayTemplate:
+    sleep_mask: int                     # bit h: hour h overlaps the sleep window
+    routine_mask: int                   # bit h: awake hour with a routine slot
+    free_mask: int                      # bit h: awake hour open for study / family / free time
+    hours: tuple[tuple[int, bool], ...] # (hour, is_routine) for awake hours, in order
+    sleep_minutes: tuple[int, int]      # (bedtime minute of day, duration in minutes)
+
+
+@lru_cache(maxsize=256)
+def day_template(sleep_start: int, sleep_hours: float, routine: Routine) -> DayTemplate:
+    routine_hours = routine.slots()
+    sleep = routine_m = free = 0
+    hours = []
+    for h in range(DAY_START, DAY_END):
+        if in_sleep(h, sleep_start, sleep_hours):
+            sleep |= 1 << h
+        elif h in routine_hours:
+            routine_m |= 1 << h
+            hours.append((h, True))
+        else:
+            free |= 1 << h
+            hours.append((h, False))
+    return DayTemplate(sleep, routine_m, free, tuple(hours),
+                       (sleep_start * 60 % MINUTES_PER_DAY, round(sleep_hours * 60)))
+
+
+def template_for(req: ScheduleRequest) -> DayTemplate:
+    return day_template(req.sleep_start, req.sleep_hours, req.routine)
+
+
+def family_by_day(req: ScheduleRequest, start_d: date) -> dict[int, FamilyEvent]:
+    """Family events inside the horizon, keyed by day offset."""
+    out = {}
+    for ds, ev in req.family_events.items():
+        d = (date.fromisoformat(ds) - start_d).days
+        if 0 <= d < req.days_remaining:
+            out[d] = ev
+    return out
+
+
+def initial_state(req: ScheduleRequest) -> tuple[int, ...]:
+    return tuple(s.chapters_remaining for s in req.subjects)
+
+
+def plan_day(req: ScheduleRequest, d: int, fam_ev: Optional[FamilyEvent],
+             template: DayTemplate, chapters: tuple[int, ...], emit) -> tuple[int, ...]:
+    """Lay out day `d` over `template`, calling emit(day, hour, category
+    [, subject, chapters]) per slot. `chapters` is the per-subject
+    chapters-left state at the start of the day; returns the state for the
+    next day."""
+    study_done = 0
+
+    fam_hours_left  = fam_ev.hours if fam_ev else 0
+    max_study_today = req.max_daily_study
+    if fam_ev:
+        max_study_today = max(1, int(req.max_daily_study * STUDY_REDUCTION[fam_ev.impact]))
+
+    # most chapters first, ties in subject order; a subject is studied
+    # until its chapters run out, then the next one is popped
+    heap = [(-c, i) for i, c in enumerate(chapters) if c > 0 or not req.carry_over]
+    heapify(heap)
+    cur = None                               # [subject id, chapters left]
+
+    for hour, is_routine in template.hours:
+        if fam_ev and fam_hours_left > 0 and hour >= FAMILY_START:
+            emit(d, hour, CAT_FAMILY)
+            fam_hours_left -= 1
+        elif is_routine:
+            emit(d, hour, CAT_ROUTINE)
+        elif study_done < max_study_today and (cur or heap):
+            if cur is None:
+                c, i = heappop(heap)
+                cur = [i, -c]
+            emit(d, hour, CAT_STUDY, cur[0], cur[1])
+            cur[1] -= 1
+            study_done += 1
+            if cur[1] <= 0:
+                cur = None
+        else:
+            emit(d, hour, CAT_FREE)
+
+    if not req.carry_over:
+        return chapters
+    left = [0] * len(chapters)
+    for c, i in heap:
+        left[i] = -c
+    if cur is not None:
+        left[cur[0]] = cur[1]
+    return tuple(left)
+
+
+def day_skeleton(req: ScheduleRequest):
+    """Fixed part of every day, for modes that place study hours themselves.
+    Returns (awake hours, [(fixed {hour: category}, candidate hours, study cap,
+    family event) per day]); req.start_date must be set."""
+    template = template_for(req)
+    fam   = family_by_day(req, req.start_date)
+    awake = [h for h, _ in template.hours]
+    days  = []
+    for d in range(req.days_remaining):
+        fam_ev   = fam.get(d)
+        fam_left = fam_ev.hours if fam_ev else 0
+        cap = req.max_daily_study
+        if fam_ev:
+            cap = max(1, int(req.max_daily_study * STUDY_REDUCTION[fam_ev.impact]))
+        fixed, cand = {}, []
+        for h, is_routine in template.hours:
+            if fam_left > 0 and h >= FAMILY_START:
+                fixed[h] = CAT_FAMILY
+                fam_left -= 1
+            elif is_routine:
+                fixed[h] = CAT_ROUTINE
+            else:
+                cand.append(h)
+        days.append((fixed, cand, cap, fam_ev))
+    return awake, days
+
+
+def schedule(req: ScheduleRequest) -> Timetable:
+    """Generate the hour-by-hour timetable for one child."""
+    start_d     = req.start_date or date.today()
+    template    = template_for(req)
+    fam         = family_by_day(req, start_d)
+    tt          = Timetable(start_d, tuple(s.name for s in req.subjects), fam)
+
+    state = initial_state(req)
+    for d in range(req.days_remaining):
+        state = plan_day(req, d, fam.get(d), template, state, tt.append)
+    return tt
+
+
+def iter_schedule(req: ScheduleRequest, chunk_days: int = 7) -> Iterator[Timetable]:
+    """Same plan as schedule(), yielded as Timetables of `chunk_days` days
+    each (day offsets stay relative to the start date), so exports can be
+    written without holding the whole horizon in memory."""
+    start_d  = req.start_date or date.today()
+    template = template_for(req)
+    fam      = family_by_day(req, start_d)
+    names    = tuple(s.name for s in req.subjects)
+
+    state = initial_state(req)
+    for first in range(0, req.days_remaining, chunk_days):
+        tt = Timetable(start_d, names, fam)
+        for d in range(first, min(first + chunk_days, req.days_remaining)):
+            state = plan_day(req, d, fam.get(d), template, state, tt.append)
+        yield tt
+
+
+def rule_scheduler(subjects, family_events_map, days_remaining,
+                   sleep_start, sleep_hours, max_daily_study,
+                   include_breakfast, include_lunch, include_nap,
+                   include_games, include_relax, include_dinner):
+    """Legacy entry point: dict-based inputs, list of display rows out."""
+    req = ScheduleRequest(
+        subjects=tuple(Subject(s["name"], int(s["chapters_remaining"]), s.get("difficulty", "medium"))
+                       for s in subjects),
+        days_remaining=int(days_remaining),
+        sleep_start=sleep_start,
+        sleep_hours=sleep_hours,
+        max_daily_study=max_daily_study,
+        routine=Routine(include_breakfast, include_lunch, include_nap,
+                        include_games, include_relax, include_dinner),
+        family_events={ds: FamilyEvent(ev["impact"], int(ev["hours"]))
+                       for ds, ev in family_events_map.items()},
+    )
+    return schedule(req).rows()
@@ -0,0 +1,92 @@
+# ============================================================
+# scheduler/export.py — streaming JSON / CSV / NDJSON writers
+# ============================================================
+# Writers take an iterable of Timetable chunks (a single Timetable
+# in a list, core.iter_schedule(), one chunk per child, ...) and
+# encode row by row straight into a file object, so no list of
+# row dicts or full output string is ever built. write_json()
+# produces byte-for-byte the same text as Timetable.to_json().
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import IO, Callable, Iterable, Optional
+
+from .timetable import COLUMNS, Timetable
+
+_enc  = json.encoder.encode_basestring_ascii
+_KEYS = tuple(map(_enc, COLUMNS))
+
+
+def _encoded_tuples(chunks: Iterable[Timetable]):
+    """Rows as tuples of JSON-encoded strings (C string encoder; every
+    column is a string, so no general-purpose json.dumps per row)."""
+    for tt in chunks:
+        for t in tt.iter_tuples():
+            yield tuple(map(_enc, t))
+
+
+def _row_template(indent: Optional[int], depth: int) -> str:
+    # same layout json.dumps gives a dict nested `depth` levels deep
+    if indent is None:
+        return "{" + ", ".join(k + ": %s" for k in _KEYS) + "}"
+    inner = "\n" + " " * (indent * (depth + 1))
+    outer = "\n" + " " * (indent * depth)
+    return "{" + inner + ("," + inner).join(k + ": %s" for k in _KEYS) + outer + "}"
+
+
+def write_json(chunks: Iterable[Timetable], fp: IO[str], indent: Optional[int] = 2) -> int:
+    """JSON array of row objects; returns the number of rows written."""
+    if indent is None:
+        start, sep, end = "[", ", ", "]"
+    else:
+        pad = " " * indent
+        start, sep, end = "[\n" + pad, ",\n" + pad, "\n]"
+    row = _row_template(indent, 1)
+    n = 0
+    for t in _encoded_tuples(chunks):
+        fp.write((sep if n else start) + row % t)
+        n += 1
+    fp.write(end if n else "[]")
+    return n
+
+
+def write_ndjson(chunks: Iterable[Timetable], fp: IO[str]) -> int:
+    """One JSON object per line."""
+    row = _row_template(None, 0) + "\n"
+    n = 0
+    for t in _encoded_tuples(chunks):
+        fp.write(row % t)
+        n += 1
+    return n
+
+
+def write_csv(chunks: Iterable[Timetable], fp: IO[str]) -> int:
+    w = csv.writer(fp, lineterminator="\n")
+    w.writerow(COLUMNS)
+    n = 0
+    for tt in chunks:
+        w.writerows(tt.iter_tuples())
+        n += len(tt)
+    return n
+
+
+WRITERS: dict[str, Callable[[Iterable[Timetable], IO[str]], int]] = {
+    "json":   write_json,
+    "ndjson": write_ndjson,
+    "csv":    write_csv,
+}
+
+
+def to_bytes(fmt: str, chunks: Iterable[Timetable]) -> bytes:
+    """Encode as UTF-8 bytes. Used for deferred download buttons: the
+    payload is only produced when the callable is invoked (Streamlit
+    holds it in memory either way, and only accepts str / bytes)."""
+    raw = io.BytesIO()
+    text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    WRITERS[fmt](chunks, text)
+    text.flush()
+    text.detach()
+    return raw.getvalue()
@@ -0,0 +1,91 @@
+# ============================================================
+# scheduler/incremental.py — re-plan only what an edit touches
+# ============================================================
+# Keeps the last plan day by day together with the chapters-left
+# state entering each day. Changing one family event re-plans
+# that day, then walks forward only while the state handed to
+# the next day differs from before; once it matches again, the
+# rest of the old plan is still valid and is kept as is.
+#
+# Without carry_over every day starts from the same state, so an
+# edit costs exactly one day.
+
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import date
+from typing import Optional
+
+from .core import FamilyEvent, ScheduleRequest, family_by_day, initial_state, plan_day, template_for
+from .timetable import Timetable
+
+
+class IncrementalScheduler:
+    def __init__(self, req: ScheduleRequest):
+        self.req = req if req.start_date else replace(req, start_date=date.today())
+        self._template = template_for(self.req)
+        self._family  = family_by_day(self.req, self.req.start_date)
+        self._cells   = [[] for _ in range(self.req.days_remaining)]   # per day: emitted slots
+        self._states  = [initial_state(self.req)] + [None] * self.req.days_remaining
+        self.days_replanned = 0
+        self._replan(0, self.req.days_remaining)
+
+    def _plan(self, d: int) -> tuple[int, ...]:
+        cells = self._cells[d] = []
+        self.days_replanned += 1
+        return plan_day(self.req, d, self._family.get(d), self._template,
+                        self._states[d], lambda *cell: cells.append(cell))
+
+    def _replan(self, first: int, last: int) -> list[int]:
+        """Re-plan from day `first`; past day `last` stop as soon as the state
+        entering the next day is unchanged. Returns the days re-planned."""
+        done = []
+        for d in range(first, self.req.days_remaining):
+            out = self._plan(d)
+            done.append(d)
+            unchanged = out == self._states[d + 1]
+            self._states[d + 1] = out
+            if unchanged and d >= last:
+                break
+        return done
+
+    # ---------- edits ----------
+    def set_family_event(self, ds: str, ev: Optional[FamilyEvent]) -> list[int]:
+        """Add, change (ev) or remove (None) the event on date `ds`."""
+        events = dict(self.req.family_events)
+        if ev is None:
+            events.pop(ds, None)
+        else:
+            events[ds] = ev
+        self.req = replace(self.req, family_events=events)
+
+        d = (date.fromisoformat(ds) - self.req.start_date).days
+        if not 0 <= d < self.req.days_remaining:
+            return []
+        if ev is None:
+            self._family.pop(d, None)
+        else:
+            self._family[d] = ev
+        return self._replan(d, d)
+
+    def update(self, req: ScheduleRequest) -> Optional[list[int]]:
+        """Move to `req`. If only family events differ, apply them as edits
+        and return the re-planned days; otherwise return None (the caller
+        should build a new IncrementalScheduler)."""
+        req = req if req.start_date else replace(req, start_date=date.today())
+        if replace(req, family_events={}) != replace(self.req, family_events={}):
+            return None
+        old, new = self.req.family_events, req.family_events
+        touched = set()
+        for ds in set(old) | set(new):
+            if old.get(ds) != new.get(ds):
+                touched.update(self.set_family_event(ds, new.get(ds)))
+        return sorted(touched)
+
+    # ---------- output ----------
+    def timetable(self) -> Timetable:
+        tt = Timetable(self.req.start_date, tuple(s.name for s in self.req.subjects), self._family)
+        for cells in self._cells:
+            for cell in cells:
+                tt.append(*cell)
+        return tt
@@ -0,0 +1,52 @@
+# ============================================================
+# scheduler/keys.py — canonical cache keys for schedule requests
+# ============================================================
+# Two requests get the same key exactly when the chosen engine
+# would produce the same timetable for them:
+#   - start_date is resolved (None -> today) so a key never spans days
+#   - family events outside the horizon are dropped, the rest sorted
+#   - profile fields an engine does not read are left out
+#     (age / grade only matter to "ml", attention_span to "ml" / "minutes")
+# Subject order is kept: it breaks ties between equal chapter counts.
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import astuple
+from datetime import date
+
+from .core import ScheduleRequest, family_by_day
+
+KEY_VERSION = 1          # bump when an engine's output changes for the same input
+
+
+def canonical(req: ScheduleRequest, mode: str = "rule", salt: str = "") -> dict:
+    """`salt` scopes the key beyond the request itself, e.g. to one
+    child's saved timetables or to the model file "ml" predicts with."""
+    start = req.start_date or date.today()
+    doc = {
+        "k": KEY_VERSION,
+        "mode": mode,
+        "start": start.isoformat(),
+        "days": req.days_remaining,
+        "subjects": [[s.name, s.chapters_remaining, s.difficulty] for s in req.subjects],
+        "sleep": [req.sleep_start, float(req.sleep_hours)],
+        "study": req.max_daily_study,
+        "routine": list(astuple(req.routine)),
+        "family": sorted([d, ev.impact, ev.hours] for d, ev in family_by_day(req, start).items()),
+        "carry": req.carry_over,
+    }
+    if mode == "ml":
+        doc["profile"] = [req.age, req.grade, float(req.attention_span)]
+    elif mode == "minutes":
+        doc["profile"] = [float(req.attention_span)]
+    if salt:
+        doc["salt"] = salt
+    return doc
+
+
+def request_key(req: ScheduleRequest, mode: str = "rule", salt: str = "") -> str:
+    """Hex SHA-256 of the canonical form."""
+    raw = json.dumps(canonical(req, mode, salt), separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
@@ -0,0 +1,212 @@
+# ============================================================
+# scheduler/minutes.py — minute-level interval engine
+# ============================================================
+# Same rules as core.schedule (sleep window, routine slots, family
+# block from 15:00, daily study cap, most-chapters-first), but the
+# day is a short list of [start, end) minute intervals instead of
+# 15 hour cells. Study is cut into attention-sized blocks
+# (25 / 45 / 60 min) with a short break after each one, and one
+# chapter counts as 60 minutes of study. When a subject runs out
+# mid-block the next one fills the rest of the block.
+#
+# The awake/routine interval list depends only on the sleep and
+# routine settings, so it is built once per configuration. A day's
+# plan depends only on its family event and the study time left, so
+# repeated days (every plain day without carry-over, every day once
+# all chapters are done) are planned once and copied.
+
+from __future__ import annotations
+
+from datetime import date
+from functools import lru_cache
+from heapq import heapify, heappop
+from typing import Optional
+
+from .core import (
+    DAY_END,
+    DAY_START,
+    FAMILY_START,
+    MINUTES_PER_DAY,
+    STUDY_REDUCTION,
+    FamilyEvent,
+    Routine,
+    ScheduleRequest,
+    family_by_day,
+)
+from .timetable import (
+    CAT_BREAK,
+    CAT_FAMILY,
+    CAT_FREE,
+    CAT_ROUTINE,
+    CAT_STUDY,
+    IntervalTimetable,
+)
+
+CHAPTER_MINUTES = 60
+MIN_BLOCK       = 15     # shortest study block squeezed into a gap
+
+# (attention_span upper bound, study block, break) in minutes
+BLOCK_SIZES = (
+    (0.8,          25, 5),
+    (1.2,          45, 10),
+    (float("inf"), 60, 15),
+)
+
+Segment = tuple[int, int, int]   # (start minute, end minute, category)
+
+
+def block_size(attention_span: float) -> tuple[int, int]:
+    """(study block, break) lengths in minutes for an attention level."""
+    for bound, block, brk in BLOCK_SIZES:
+        if attention_span < bound:
+            return block, brk
+    return BLOCK_SIZES[-1][1:]
+
+
+def _subtract(spans: list[tuple[int, int]], a: int, b: int) -> list[tuple[int, int]]:
+    out = []
+    for s, e in spans:
+        if b <= s or e <= a:
+            out.append((s, e))
+            continue
+        if s < a:
+            out.append((s, a))
+        if b < e:
+            out.append((b, e))
+    return out
+
+
+@lru_cache(maxsize=256)
+def day_segments(sleep_start: int, sleep_hours: float, routine: Routine) -> tuple[Segment, ...]:
+    """Awake part of [DAY_START, DAY_END) as ordered routine / free intervals."""
+    bed = sleep_start * 60 % MINUTES_PER_DAY
+    dur = min(round(sleep_hours * 60), MINUTES_PER_DAY)
+    awake = [(DAY_START * 60, DAY_END * 60)]
+    awake = _subtract(awake, bed, bed + dur)
+    if bed + dur > MINUTES_PER_DAY:
+        awake = _subtract(awake, 0, bed + dur - MINUTES_PER_DAY)
+
+    routine_hours = routine.slots()
+    out = []
+    for s, e in awake:
+        t = s
+        while t < e:
+            h = t // 60
+            if h in routine_hours:
+                end, cat = min(e, (h + 1) * 60), CAT_ROUTINE
+            else:
+                # run to the next routine hour or the end of the awake span
+                end = e
+                for rh in routine_hours:
+                    if t < rh * 60 < end:
+                        end = rh * 60
+                cat = CAT_FREE
+            out.append((t, end, cat))
+            t = end
+    return tuple(out)
+
+
+@lru_cache(maxsize=1024)
+def with_family(segments: tuple[Segment, ...], minutes: int) -> tuple[Segment, ...]:
+    """Overlay a family block on the first `minutes` awake minutes from
+    FAMILY_START; routine slots inside the block give way to it."""
+    if minutes <= 0:
+        return segments
+    out = []
+    fam_from = FAMILY_START * 60
+    for s, e, cat in segments:
+        if minutes <= 0 or e <= fam_from:
+            out.append((s, e, cat))
+            continue
+        if s < fam_from:
+            out.append((s, fam_from, cat))
+            s = fam_from
+        end = min(e, s + minutes)
+        if out and out[-1][2] == CAT_FAMILY and out[-1][1] == s:
+            out[-1] = (out[-1][0], end, CAT_FAMILY)
+        else:
+            out.append((s, end, CAT_FAMILY))
+        minutes -= end - s
+        if end < e:
+            out.append((end, e, cat))
+    return tuple(out)
+
+
+def plan_day(req: ScheduleRequest, d: int, fam_ev: Optional[FamilyEvent],
+             segments: tuple[Segment, ...], minutes_left: tuple[int, ...],
+             emit) -> tuple[int, ...]:
+    """Fill day `d`, calling emit(day, start, length, category[, subject,
+    chapters]) per interval. `minutes_left` is the per-subject study time
+    still needed; returns the state for the next day."""
+    block, brk = block_size(req.attention_span)
+    budget = req.max_daily_study * 60
+    if fam_ev:
+        budget = max(1, int(req.max_daily_study * STUDY_REDUCTION[fam_ev.impact])) * 60
+        segments = with_family(segments, fam_ev.hours * 60)
+
+    heap = [(-m, i) for i, m in enumerate(minutes_left) if m > 0]
+    heapify(heap)
+    cur  = None                              # [subject id, minutes left]
+    todo = sum(minutes_left)                 # study minutes still to place
+
+    for s, e, cat in segments:
+        if cat != CAT_FREE:
+            emit(d, s, e - s, cat)
+            continue
+        t = s
+        while budget > 0 and todo > 0 and t < e:
+            want = min(block, budget, todo)
+            end  = min(t + want, e)
+            if end - t < want and end - t < MIN_BLOCK:
+                break
+            budget -= end - t
+            todo   -= end - t
+            # one attention block, continued with the next subject when
+            # the current one runs out
+            while t < end:
+                if cur is None:
+                    m, i = heappop(heap)
+                    cur = [i, -m]
+                n = min(end - t, cur[1])
+                emit(d, t, n, CAT_STUDY, cur[0], -(-cur[1] // CHAPTER_MINUTES))
+                t += n
+                cur[1] -= n
+                if cur[1] <= 0:
+                    cur = None
+            if t < e and budget > 0 and todo > 0:
+                n = min(brk, e - t)
+                emit(d, t, n, CAT_BREAK)
+                t += n
+        if t < e:
+            emit(d, t, e - t, CAT_FREE)
+
+    if not req.carry_over:
+        return minutes_left
+    left = [0] * len(minutes_left)
+    for m, i in heap:
+        left[i] = -m
+    if cur is not None:
+        left[cur[0]] = cur[1]
+    return tuple(left)
+
+
+def schedule_minutes(req: ScheduleRequest) -> IntervalTimetable:
+    """Minute-level timetable with attention-sized study blocks."""
+    start_d  = req.start_date or date.today()
+    segments = day_segments(req.sleep_start, req.sleep_hours, req.routine)
+    fam      = family_by_day(req, start_d)
+    tt       = IntervalTimetable(start_d, tuple(s.name for s in req.subjects), fam)
+
+    state = tuple(s.chapters_remaining * CHAPTER_MINUTES for s in req.subjects)
+    plans = {}                               # (family event, state) -> (day plan, next state)
+    for d in range(req.days_remaining):
+        fam_ev = fam.get(d)
+        hit = plans.get((fam_ev, state))
+        if hit is None:
+            lo = len(tt)
+            state_in, state = state, plan_day(req, d, fam_ev, segments, state, tt.append_interval)
+            plans[fam_ev, state_in] = (tt.take(lo, len(tt)), state)
+        else:
+            tt.append_day(d, hit[0])
+            state = hit[1]
+    return tt
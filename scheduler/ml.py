@@ -0,0 +1,169 @@
+# ============================================================
+# scheduler/ml.py — ML-guided study slot assignment
+# ============================================================
+# Uses the effective-minutes model from train_model.py to decide
+# which free hours become study hours and which subject goes in
+# each. Sleep, routine and family blocks follow the same rules as
+# core.schedule(); only the study allocation changes.
+#
+# All candidate (day, hour, subject) rows of a timetable — or of
+# a whole cohort — are scored with ONE model.predict call.
+
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import date, timedelta
+from typing import Sequence
+
+import numpy as np
+
+from .core import ScheduleRequest, day_skeleton
+from .timetable import CAT_FREE, CAT_STUDY, Timetable
+
+# column order of train_model.py's X
+FEATURES = ("age", "grade", "sleep_hours", "days_remaining", "family_event",
+            "slot_hour", "is_weekend", "attention_span", "subject",
+            "subj_difficulty", "chapters_remaining", "urgency")
+
+
+# ============================================================
+# FEATURES
+# ============================================================
+def _is_weekend(start: date, day: int) -> int:
+    return int((start + timedelta(days=day)).weekday() >= 5)
+
+
+def _add_row(cols: dict[str, list], req: ScheduleRequest, s, day: int, hour: int,
+             family: bool, is_weekend: int) -> None:
+    """Append one (day, hour, subject) row: the only place a feature is
+    computed, for scoring (feature_rows) and for logging (slot_features)."""
+    days_left = req.days_remaining - day
+    cols["age"].append(req.age)
+    cols["grade"].append(req.grade)
+    cols["sleep_hours"].append(req.sleep_hours)
+    cols["days_remaining"].append(days_left)
+    cols["family_event"].append(int(family))
+    cols["slot_hour"].append(hour)
+    cols["is_weekend"].append(is_weekend)
+    cols["attention_span"].append(req.attention_span)
+    cols["subject"].append(s.name)
+    cols["subj_difficulty"].append(s.difficulty)
+    cols["chapters_remaining"].append(s.chapters_remaining)
+    cols["urgency"].append((s.chapters_remaining + 0.5) / max(1, days_left))
+
+
+def feature_rows(req: ScheduleRequest, skeleton) -> dict[str, list]:
+    """Columns for every candidate (day, hour, subject), day-major."""
+    cols = {f: [] for f in FEATURES}
+    _, days = skeleton
+    for d, (_, cand, _, fam_ev) in enumerate(days):
+        weekend = _is_weekend(req.start_date, d)
+        for h in cand:
+            for s in req.subjects:
+                _add_row(cols, req, s, d, h, fam_ev is not None, weekend)
+    return cols
+
+
+def slot_features(req: ScheduleRequest, tt: Timetable, max_days: int | None = None):
+    """(indices into `tt`, feature columns) for the study hours `tt`
+    actually schedules — any hourly engine — within the first
+    `max_days` days."""
+    by_name = {s.name: s for s in req.subjects}
+    cols = {f: [] for f in FEATURES}
+    idx  = []
+    for i in range(len(tt)):
+        d = tt.day[i]
+        if max_days is not None and d >= max_days:
+            break                                   # entries are day-major
+        if tt.category[i] != CAT_STUDY:
+            continue
+        s = by_name[tt.subjects[tt.subject[i]]]
+        _add_row(cols, req, s, d, tt.hour[i], d in tt.family_events, _is_weekend(tt.start_date, d))
+        idx.append(i)
+    return idx, cols
+
+
+def model_predict(model, cols: dict[str, list]):
+    """Score feature columns with one predict call. `model` may be a fitted
+    Pipeline or anything with predict_columns() (PredictionCache,
+    CompactForest), which skips building a DataFrame."""
+    if hasattr(model, "predict_columns"):
+        return model.predict_columns(cols)
+    import pandas as pd
+    return model.predict(pd.DataFrame(cols, columns=list(FEATURES)))
+
+
+def predict_frame(model, cols: dict[str, list]):
+    if not cols["age"]:
+        return np.empty(0)
+    return model_predict(model, cols)
+
+
+# ============================================================
+# ASSIGNMENT
+# ============================================================
+def _assign(req: ScheduleRequest, skeleton, scores) -> Timetable:
+    """Per day, greedily take the best (hour, subject) pairs by predicted
+    minutes until the study cap is hit; each hour holds one subject and a
+    subject gets at most its remaining chapters that day."""
+    awake, days = skeleton
+    n_subj = len(req.subjects)
+    fam_by_day = {d: ev for d, (_, _, _, ev) in enumerate(days) if ev}
+    tt = Timetable(req.start_date, tuple(s.name for s in req.subjects), fam_by_day)
+
+    pos = 0
+    for d, (fixed, cand, cap, _) in enumerate(days):
+        n = len(cand) * n_subj
+        block = scores[pos:pos + n]
+        pos += n
+
+        order = (-block).argsort(kind="stable")
+        left  = [s.chapters_remaining for s in req.subjects]
+        taken = {}
+        for i in order:
+            if len(taken) >= cap:
+                break
+            h, si = cand[i // n_subj], i % n_subj
+            if h in taken or left[si] <= 0:
+                continue
+            taken[h] = si
+            left[si] -= 1
+
+        shown = [s.chapters_remaining for s in req.subjects]
+        for h in awake:
+            if h in fixed:
+                tt.append(d, h, fixed[h])
+            elif h in taken:
+                si = taken[h]
+                tt.append(d, h, CAT_STUDY, si, shown[si])
+                shown[si] -= 1
+            else:
+                tt.append(d, h, CAT_FREE)
+    return tt
+
+
+# ============================================================
+# PUBLIC API
+# ============================================================
+def schedule_ml_cohort(requests: Sequence[ScheduleRequest], model) -> list[Timetable]:
+    """ML-guided timetables for several children with a single predict call."""
+    today = date.today()
+    reqs  = [r if r.start_date else replace(r, start_date=today) for r in requests]
+    skels = [day_skeleton(r) for r in reqs]
+
+    cols   = {f: [] for f in FEATURES}
+    bounds = [0]
+    for r, sk in zip(reqs, skels):
+        part = feature_rows(r, sk)
+        for f in FEATURES:
+            cols[f].extend(part[f])
+        bounds.append(len(cols["age"]))
+
+    scores = predict_frame(model, cols)
+    return [_assign(r, sk, scores[lo:hi])
+            for r, sk, lo, hi in zip(reqs, skels, bounds, bounds[1:])]
+
+
+def schedule_ml(req: ScheduleRequest, model) -> Timetable:
+    """ML-guided timetable for one child (one batched predict)."""
+    return schedule_ml_cohort([req], model)[0]
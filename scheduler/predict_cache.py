@@ -0,0 +1,70 @@
+# ============================================================
+# scheduler/predict_cache.py — bounded LRU in front of the model
+# ============================================================
+# The model's inputs come from sliders / selectboxes with small
+# discrete domains, so the same feature tuples show up again and
+# again across children and sessions. One PredictionCache per
+# process (app.py keeps it in st.cache_resource) answers those
+# from memory; only unseen tuples go to the model, in one batch.
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .ml import FEATURES, model_predict
+
+
+class PredictionCache:
+    def __init__(self, model, maxsize: int = 50_000):
+        self.model     = model
+        self.maxsize   = maxsize
+        self._data     = OrderedDict()      # feature tuple -> predicted minutes
+        self._lock     = threading.Lock()
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def predict_columns(self, cols: dict[str, list]) -> np.ndarray:
+        """Predictions for feature columns (as built by scheduler.ml.feature_rows)."""
+        keys = list(zip(*(cols[f] for f in FEATURES)))
+        out  = np.empty(len(keys))
+        missing = {}                          # key -> positions in `out`
+        with self._lock:
+            for i, k in enumerate(keys):
+                v = self._data.get(k)
+                if v is None:
+                    missing.setdefault(k, []).append(i)
+                else:
+                    self._data.move_to_end(k)
+                    out[i] = v
+            n_miss = sum(len(p) for p in missing.values())
+            self.hits   += len(keys) - n_miss
+            self.misses += n_miss
+
+        if missing:
+            uniq  = list(missing)
+            preds = model_predict(self.model, dict(zip(FEATURES, map(list, zip(*uniq)))))
+            with self._lock:
+                for k, v in zip(uniq, preds):
+                    out[missing[k]] = v
+                    self._data[k] = float(v)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+        return out
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"size": len(self._data), "maxsize": self.maxsize,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
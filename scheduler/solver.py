@@ -0,0 +1,119 @@
+# ============================================================
+# scheduler/solver.py — balanced multi-day chapter allocation
+# ============================================================
+# Plans the whole horizon at once instead of day by day: every
+# chapter of every subject is placed on exactly one day, chapters
+# carry over, no day exceeds its study cap (family events lower
+# it) and each subject's chapters are spread evenly up to the
+# exam.
+#
+# Chapters are ordered by when their subject would ideally study
+# them — chapter k of c at (k + phase) / c of the horizon, the phase
+# staggered per subject so subjects interleave instead of landing
+# on the same days. The i-th of n chapters in that order then gets
+# the evenly spaced target day
+#     t_i = (i + 0.5) * D / n - 0.5
+# and placing it on day d costs |d - t_i|: each subject stays spread
+# out, and the daily load stays within one chapter of n / D wherever
+# the caps allow. Because that cost is convex along the day axis,
+# some optimal assignment keeps the chapters in order, so the
+# transportation problem reduces to a DP over (chapters placed, day)
+# — about D x cap vectorized NumPy steps. Chapters that do not fit
+# the total capacity are dropped at a fixed penalty.
+#
+# Without NumPy it falls back to the heap-based day-by-day greedy
+# in core.plan_day with carry_over enabled.
+
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import date
+
+from .core import ScheduleRequest, day_skeleton, schedule
+from .timetable import CAT_FREE, CAT_STUDY, Timetable
+
+try:
+    import numpy as np
+except ImportError:          # pragma: no cover - exercised only without NumPy
+    np = None
+
+
+def _targets(chapters, n_days):
+    """(position in the horizon, subject id, chapter index) for every
+    chapter, sorted; positions are fractions of the horizon."""
+    n_subj = len(chapters)
+    items  = []
+    for si, c in enumerate(chapters):
+        phase = (si + 0.5) / n_subj
+        for k in range(c):
+            items.append(((k + phase) / c, si, k))
+    items.sort()
+    return items
+
+
+def allocate(chapters, caps):
+    """Chapter -> day assignment minimising total distance to the target days.
+
+    chapters: chapters per subject; caps: study slots available per day.
+    Returns per day the list of subject ids to study, in order."""
+    n_days  = len(caps)
+    items   = _targets(chapters, n_days)
+    n       = len(items)
+    penalty = 4.0 * n_days + 1.0          # cost of leaving a chapter unplanned
+    t       = (np.arange(n) + 0.5) * n_days / max(n, 1) - 0.5
+    j       = np.arange(n + 1)
+
+    f = penalty * j                        # before day 0: first j chapters dropped
+    take = np.zeros((n_days, n + 1), dtype=np.int16)    # chapters placed on day d
+    skip = np.zeros((n_days, n + 1), dtype=bool)        # chapter j-1 dropped at day d
+    for d in range(n_days):
+        prefix = np.concatenate(([0.0], np.cumsum(np.abs(d - t))))
+        best, arg = f.copy(), np.zeros(n + 1, dtype=np.int16)
+        for m in range(1, min(caps[d], n) + 1):
+            cand = np.full(n + 1, np.inf)
+            cand[m:] = f[:-m] + prefix[m:] - prefix[:-m]
+            better = cand < best
+            best[better], arg[better] = cand[better], m
+        # dropping chapters: g[j] = min_k best[k] + (j - k) * penalty
+        shifted = best - penalty * j
+        low     = np.minimum.accumulate(shifted)
+        skip[d] = low < shifted - 1e-9       # tolerance: the shift is not exact in floats
+        g       = low + penalty * j
+        take[d] = arg
+        f = g
+
+    plan = [[] for _ in range(n_days)]
+    jj = n
+    for d in range(n_days - 1, -1, -1):
+        while skip[d, jj]:
+            jj -= 1
+        m = int(take[d, jj])
+        plan[d] = [items[i][1] for i in range(jj - m, jj)]
+        jj -= m
+    return plan
+
+
+def schedule_balanced(req: ScheduleRequest) -> Timetable:
+    """Timetable whose study hours come from the global allocation."""
+    if np is None:
+        return schedule(replace(req, carry_over=True))
+    req = req if req.start_date else replace(req, start_date=date.today())
+    awake, days = day_skeleton(req)
+    chapters = [max(s.chapters_remaining, 0) for s in req.subjects]
+    plan = allocate(chapters, [min(cap, len(cand)) for _, cand, cap, _ in days])
+
+    fam = {d: ev for d, (_, _, _, ev) in enumerate(days) if ev}
+    tt  = Timetable(req.start_date, tuple(s.name for s in req.subjects), fam)
+    left = list(chapters)
+    for d, (fixed, cand, _, _) in enumerate(days):
+        study = dict(zip(cand, plan[d]))   # earliest free hours get the day's chapters
+        for h in awake:
+            if h in fixed:
+                tt.append(d, h, fixed[h])
+            elif h in study:
+                si = study[h]
+                tt.append(d, h, CAT_STUDY, si, left[si])
+                left[si] -= 1
+            else:
+                tt.append(d, h, CAT_FREE)
+    return tt
@@ -0,0 +1,217 @@
+# ============================================================
+# scheduler/timetable.py — compact columnar timetable
+# ============================================================
+# One entry per scheduled hour, stored as parallel typed arrays
+# (day offset, hour, category code, subject id, chapters left).
+# Display strings are only built when a caller asks for rows,
+# JSON, CSV or a DataFrame.
+
+from __future__ import annotations
+
+import csv
+import io
+from array import array
+from datetime import date, timedelta
+from itertools import islice
+from typing import Iterator, Mapping, Optional
+
+# category codes
+CAT_FREE    = 0
+CAT_STUDY   = 1
+CAT_FAMILY  = 2
+CAT_ROUTINE = 3
+CAT_BREAK   = 4     # minute-level plans only (scheduler.minutes)
+
+NO_SUBJECT = 255
+
+COLUMNS = ("📅 Date", "🕐 Time", "📚 Subject", "📋 Task")
+
+TIME_LABELS = tuple(f"{h}:00 – {h+1}:00" for h in range(24))
+
+FAMILY_LABEL = "👨‍👩‍👧 Family Event"
+FREE_LABEL   = "🌟 Free Time"
+FREE_TASK    = "Rest / Light Activity"
+BREAK_LABEL  = "☕ Break"
+BREAK_TASK   = "Short Break"
+
+# hour -> (Routine field, label)
+ROUTINE_SLOTS = {
+    8:  ("breakfast", "🥣 Breakfast"),
+    13: ("lunch",     "🍱 Lunch"),
+    14: ("nap",       "😴 Nap Time"),
+    17: ("games",     "⚽ Games / Sports"),
+    18: ("relax",     "🎵 Relax Time"),
+    20: ("dinner",    "🍽️ Dinner"),
+}
+
+
+class Timetable:
+    __slots__ = ("start_date", "subjects", "family_events",
+                 "day", "hour", "category", "subject", "chapters", "counts")
+
+    def __init__(self, start_date: date, subjects: tuple[str, ...],
+                 family_events: Optional[Mapping[int, object]] = None):
+        self.start_date    = start_date
+        self.subjects      = subjects                   # subject id -> name
+        self.family_events = dict(family_events or {})  # day offset -> FamilyEvent
+        self.day      = array("H")
+        self.hour     = array("B")
+        self.category = array("B")
+        self.subject  = array("B")
+        self.chapters = array("H")
+        self.counts   = [0, 0, 0, 0, 0]                 # per category code
+
+    @classmethod
+    def from_columns(cls, start_date: date, subjects: tuple[str, ...],
+                     family_events: Optional[Mapping[int, object]],
+                     day: bytes, hour: bytes, category: bytes,
+                     subject: bytes, chapters: bytes) -> "Timetable":
+        """Wrap pre-built columns given as raw native-endian buffers
+        (uint16 day, uint8 hour/category/subject, uint16 chapters)."""
+        tt = cls(start_date, subjects, family_events)
+        tt.day.frombytes(day)
+        tt.hour.frombytes(hour)
+        tt.category.frombytes(category)
+        tt.subject.frombytes(subject)
+        tt.chapters.frombytes(chapters)
+        tt.counts = [tt.category.count(c) for c in range(len(tt.counts))]
+        return tt
+
+    def append(self, day: int, hour: int, category: int,
+               subject: int = NO_SUBJECT, chapters: int = 0) -> None:
+        self.day.append(day)
+        self.hour.append(hour)
+        self.category.append(category)
+        self.subject.append(subject)
+        self.chapters.append(chapters)
+        self.counts[category] += 1
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    # ---------- stat badges (O(1)) ----------
+    @property
+    def total_slots(self) -> int:
+        return len(self.day)
+
+    @property
+    def study_slots(self) -> int:
+        return self.counts[CAT_STUDY]
+
+    @property
+    def family_slots(self) -> int:
+        return self.counts[CAT_FAMILY]
+
+    # ---------- rendering ----------
+    def _date_labels(self) -> list[str]:
+        """Labels for day offsets day[0]..day[-1]; chunks from
+        core.iter_schedule start at a non-zero offset."""
+        if not self.day:
+            return []
+        first = self.day[0]
+        return [str(self.start_date + timedelta(days=d)) for d in range(first, self.day[-1] + 1)]
+
+    def _subject_task(self, i: int) -> tuple[str, str]:
+        cat = self.category[i]
+        if cat == CAT_STUDY:
+            return self.subjects[self.subject[i]], f"Study — Ch. remaining: {self.chapters[i]}"
+        if cat == CAT_ROUTINE:
+            return ROUTINE_SLOTS[self.hour[i]][1], "Routine"
+        if cat == CAT_FAMILY:
+            ev = self.family_events[self.day[i]]
+            return FAMILY_LABEL, f"Family Time · {ev.impact} impact · {ev.hours}h total"
+        if cat == CAT_BREAK:
+            return BREAK_LABEL, BREAK_TASK
+        return FREE_LABEL, FREE_TASK
+
+    def _time_label(self, i: int) -> str:
+        return TIME_LABELS[self.hour[i]]
+
+    def iter_tuples(self) -> Iterator[tuple[str, str, str, str]]:
+        dates = self._date_labels()
+        first = self.day[0] if self.day else 0
+        for i in range(len(self.day)):
+            subj, task = self._subject_task(i)
+            yield dates[self.day[i] - first], self._time_label(i), subj, task
+
+    def iter_rows(self) -> Iterator[dict]:
+        for t in self.iter_tuples():
+            yield dict(zip(COLUMNS, t))
+
+    def rows(self) -> list[dict]:
+        """Legacy list-of-dicts form (same keys the UI has always shown)."""
+        return list(self.iter_rows())
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        from .export import write_json
+        buf = io.StringIO()
+        write_json((self,), buf, indent)
+        return buf.getvalue()
+
+    def to_csv(self) -> str:
+        buf = io.StringIO()
+        w = csv.writer(buf, lineterminator="\n")
+        w.writerow(COLUMNS)
+        w.writerows(self.iter_tuples())
+        return buf.getvalue()
+
+    def to_dataframe(self, limit: Optional[int] = None):
+        import pandas as pd
+        rows = self.iter_tuples()
+        if limit is not None:
+            rows = islice(rows, limit)
+        return pd.DataFrame(list(rows), columns=list(COLUMNS))
+
+
+class IntervalTimetable(Timetable):
+    """Timetable whose entries are minute intervals of varying length.
+    `hour` still holds the hour each interval starts in, so routine labels
+    and hour-based consumers keep working; `start` / `length` carry the
+    exact minute of day and duration."""
+    __slots__ = ("start", "length")
+
+    def __init__(self, start_date: date, subjects: tuple[str, ...],
+                 family_events: Optional[Mapping[int, object]] = None):
+        super().__init__(start_date, subjects, family_events)
+        self.start  = array("H")
+        self.length = array("H")
+
+    def append_interval(self, day: int, start: int, length: int, category: int,
+                        subject: int = NO_SUBJECT, chapters: int = 0) -> None:
+        # Timetable.append inlined: minute plans emit several entries per hour
+        self.start.append(start)
+        self.length.append(length)
+        self.day.append(day)
+        self.hour.append(start // 60)
+        self.category.append(category)
+        self.subject.append(subject)
+        self.chapters.append(chapters)
+        self.counts[category] += 1
+
+    def take(self, lo: int, hi: int) -> "IntervalTimetable":
+        """Entries [lo, hi) as a new timetable."""
+        out = IntervalTimetable(self.start_date, self.subjects)
+        for name in ("day", "hour", "category", "subject", "chapters", "start", "length"):
+            getattr(out, name).extend(getattr(self, name)[lo:hi])
+        out.counts = [out.category.count(c) for c in range(len(out.counts))]
+        return out
+
+    def append_day(self, day: int, plan: "IntervalTimetable") -> None:
+        """Append every entry of a one-day `plan` as day `day`."""
+        self.day.extend(array("H", (day,)) * len(plan))
+        self.hour.extend(plan.hour)
+        self.category.extend(plan.category)
+        self.subject.extend(plan.subject)
+        self.chapters.extend(plan.chapters)
+        self.start.extend(plan.start)
+        self.length.extend(plan.length)
+        self.counts = [a + b for a, b in zip(self.counts, plan.counts)]
+
+    @property
+    def study_minutes(self) -> int:
+        return sum(n for n, c in zip(self.length, self.category) if c == CAT_STUDY)
+
+    def _time_label(self, i: int) -> str:
+        s = self.start[i]
+        e = s + self.length[i]
+        return f"{s // 60}:{s % 60:02d} – {e // 60}:{e % 60:02d}"
@@ -0,0 +1,252 @@
+# ============================================================
+# service.py — JSON scheduling API (ASGI)
+# ============================================================
+# uvicorn service:app --port 8000
+# python service.py --port 8000 --workers 4 [--memory]
+#
+#   POST /timetables        child profile (ScheduleRequest.from_dict JSON,
+#                           plus optional "name" and "mode") -> timetable
+#   GET  /timetables/{id}   a saved timetable
+#   GET  /health            Mongo status, cache and pool counters
+#
+# Scheduling runs in a process pool so the event loop only parses,
+# hashes and routes. Requests are keyed by scheduler.keys.request_key:
+# a key already answered is served from an in-memory LRU of encoded
+# response bodies, and a key still being computed is awaited instead
+# of computed twice. Below that, persistence.TimetableMemo finds
+# inputs that were generated and saved before (this process or any
+# other), so each distinct input is saved once. New timetables go
+# through the write-behind queue (GET may 404 until it is flushed).
+#
+# --memory swaps MongoDB for an in-process mongomock store, for local
+# testing without a server.
+
+import argparse
+import asyncio
+import io
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from resources import model_available, model_version
+from scheduler import ScheduleRequest
+from scheduler.keys import request_key
+
+MODES = ("rule", "balanced", "minutes", "ml")
+
+
+# ============================================================
+# WORKER (runs in the process pool)
+# ============================================================
+def generate(req, mode, tt_doc=None):
+    """Returns (codec document, [total, study, family] slots, rows as JSON
+    text). With `tt_doc` (a memo hit) the stored timetable is rendered
+    instead of scheduling again."""
+    from batch import build
+    from scheduler.codec import decode, encode
+    from scheduler.export import write_json
+
+    tt  = decode(tt_doc) if tt_doc is not None else build(req, mode)
+    buf = io.StringIO()
+    write_json((tt,), buf, indent=None)
+    return tt_doc or encode(tt), [tt.total_slots, tt.study_slots, tt.family_slots], buf.getvalue()
+
+
+# ============================================================
+# SERVICE STATE
+# ============================================================
+class MemoryMongo:
+    """mongomock stand-in with the MongoResource interface used here."""
+
+    def __init__(self, db_name="timetable_app"):
+        import mongomock
+        self.db = mongomock.MongoClient()[db_name]
+
+    def collection(self, name):
+        return self.db[name]
+
+    def status(self):
+        return True
+
+
+class SchedulingService:
+    def __init__(self, mongo, workers=None, cache_size=1024):
+        from persistence import SavedTimetables, TimetableMemo, WriteBehindQueue
+        self.mongo      = mongo
+        self.writer     = WriteBehindQueue(mongo)
+        self.memo       = TimetableMemo(SavedTimetables(mongo))
+        # workers=0: schedule in a thread instead (tests, tiny deployments)
+        self.pool       = (ThreadPoolExecutor(1) if workers == 0
+                           else ProcessPoolExecutor(max_workers=workers or os.cpu_count()))
+        self.cache_size = cache_size
+        self._cache     = OrderedDict()   # request key -> response body
+        self._inflight  = {}              # request key -> asyncio.Task
+        self.metrics    = {"requests": 0, "hits": 0, "coalesced": 0, "memo_hits": 0, "computed": 0}
+
+    async def timetable(self, profile, req, mode):
+        """(response body, cache status) for one request."""
+        self.metrics["requests"] += 1
+        key = request_key(req, mode, f"{profile.get('name', '')}|{model_version() if mode == 'ml' else ''}")
+        body = self._cache.get(key)
+        if body is not None:
+            self._cache.move_to_end(key)
+            self.metrics["hits"] += 1
+            return body, "hit"
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, profile, req, mode))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            status = "miss"
+        else:
+            self.metrics["coalesced"] += 1
+            status = "coalesced"
+        # shielded: a client going away must not cancel work others wait on
+        return await asyncio.shield(task), status
+
+    async def _compute(self, key, profile, req, mode):
+        loop = asyncio.get_running_loop()
+        # saved before (persistence.TimetableMemo): render it, don't save again
+        hit = await run_in_threadpool(self.memo.get, key)
+        doc, (total, study, family), rows = await loop.run_in_executor(
+            self.pool, generate, req, mode, hit and hit["tt"])
+
+        if hit is not None:
+            self.metrics["memo_hits"] += 1
+            _id = hit["_id"]
+        else:
+            self.metrics["computed"] += 1
+            now = datetime.now(timezone.utc)
+            tt_doc = {"tt": doc, "key": key, "created_at": now}
+            saved = self.writer.save_timetable(
+                {"name": profile.get("name", ""), "age": req.age, "grade": req.grade,
+                 "subjects": [s.name for s in req.subjects],
+                 "family_events": {ds: {"impact": ev.impact, "hours": ev.hours}
+                                   for ds, ev in req.family_events.items()},
+                 "created_at": now},
+                tt_doc,
+                # memoised once written, so a failed save is regenerated next time
+                on_written=lambda d: self.memo.put(key, d["_id"], d["tt"]),
+            )
+            _id = tt_doc["_id"] if saved is not None else None
+        head = json.dumps({
+            "id":    str(_id) if _id is not None else None,
+            "key":   key,
+            "mode":  mode,
+            "stats": {"total": total, "study": study, "family": family},
+        })
+        body = f'{head[:-1]}, "timetable": {rows}}}'.encode()
+
+        self._cache[key] = body
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return body
+
+    def stats(self):
+        return dict(self.metrics, cached=len(self._cache), inflight=len(self._inflight),
+                    memo=self.memo.stats(), writer=self.writer.stats())
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.writer.flush(5)
+        self.writer.close()
+
+
+# ============================================================
+# ROUTES
+# ============================================================
+def _error(status, message):
+    return JSONResponse({"error": message}, status_code=status)
+
+
+async def post_timetable(request: Request):
+    svc = request.app.state.service
+    try:
+        profile = await request.json()
+        if not isinstance(profile, dict):
+            raise TypeError("profile must be a JSON object")
+        mode = profile.get("mode", "rule")
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        if mode == "ml" and not model_available():
+            raise ValueError("ml mode needs a trained model")
+        # checked before hashing: request_key parses event dates, and
+        # out-of-range inputs must not reach (or tie up) a pool process
+        req = ScheduleRequest.from_dict(profile).validate()
+    except (KeyError, ValueError, TypeError, AttributeError) as e:
+        return _error(400, f"invalid profile: {e}")
+    body, status = await svc.timetable(profile, req, mode)
+    return Response(body, media_type="application/json", headers={"X-Cache": status})
+
+
+async def get_timetable(request: Request):
+    from bson import ObjectId
+    from bson.errors import InvalidId
+    from scheduler.codec import timetable_from_doc
+    from scheduler.export import write_json
+
+    svc = request.app.state.service
+    try:
+        _id = ObjectId(request.path_params["id"])
+    except InvalidId:
+        return _error(404, "not found")
+    doc = await run_in_threadpool(svc.mongo.collection("timetables").find_one, {"_id": _id})
+    if doc is None:
+        return _error(404, "not found")
+    buf = io.StringIO()
+    write_json((timetable_from_doc(doc),), buf, indent=None)
+    return Response(f'{{"id": "{_id}", "timetable": {buf.getvalue()}}}', media_type="application/json")
+
+
+async def health(request: Request):
+    svc = request.app.state.service
+    return JSONResponse({"mongo": svc.mongo.status(), **svc.stats()})
+
+
+def create_app(mongo=None, workers=None, cache_size=None):
+    """`mongo`: anything with .collection(name) / .status() (default:
+    resources.get_mongo()); workers=0 runs scheduling on a thread."""
+
+    @asynccontextmanager
+    async def lifespan(app):
+        nonlocal mongo, workers
+        if mongo is None:
+            from resources import get_mongo
+            mongo = get_mongo()
+        if workers is None and os.getenv("SERVICE_WORKERS"):
+            workers = int(os.getenv("SERVICE_WORKERS"))
+        app.state.service = SchedulingService(
+            mongo, workers, cache_size or int(os.getenv("SERVICE_CACHE_SIZE", 1024)))
+        try:
+            yield
+        finally:
+            app.state.service.close()
+
+    return Starlette(routes=[
+        Route("/timetables", post_timetable, methods=["POST"]),
+        Route("/timetables/{id}", get_timetable, methods=["GET"]),
+        Route("/health", health, methods=["GET"]),
+    ], lifespan=lifespan)
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+    ap = argparse.ArgumentParser(description="Timetable scheduling API")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--workers", type=int, default=None, help="scheduling processes (default: CPU count)")
+    ap.add_argument("--memory", action="store_true", help="use an in-memory mongomock store")
+    args = ap.parse_args()
+    uvicorn.run(create_app(MemoryMongo() if args.memory else None, args.workers), host=args.host, port=args.port)
@@ -0,0 +1,88 @@
+# ============================================================
+# tests/test_engines.py — alternative paths produce schedule()'s plan
+# ============================================================
+import random
+from dataclasses import replace
+from datetime import date, timedelta
+
+import pytest
+
+from scheduler import FamilyEvent, ScheduleRequest, schedule
+from scheduler.codec import decode, encode
+from scheduler.core import iter_schedule
+from scheduler.incremental import IncrementalScheduler
+
+START = date(2026, 1, 5)
+COLUMNS = ("day", "hour", "category", "subject", "chapters", "counts")
+
+
+def _random_request(rng, carry_over=False):
+    days = rng.randint(1, 40)
+    return ScheduleRequest.from_dict({
+        "subjects": {f"S{i}": rng.randint(0, 10) for i in range(rng.randint(1, 10))},
+        "days_remaining": days,
+        "max_daily_study": rng.randint(1, 8),
+        "sleep_start": rng.choice([20, 21, 22, 23]),
+        "sleep_hours": rng.choice([8, 8.5, 9, 10]),
+        "routine": {"nap": rng.random() < 0.5, "games": rng.random() < 0.5},
+        "carry_over": carry_over,
+        "start_date": START.isoformat(),
+        "family_events": {
+            str(START + timedelta(days=rng.randrange(days))):
+                {"impact": rng.choice(["low", "medium", "high"]), "hours": rng.randint(1, 8)}
+            for _ in range(rng.randint(0, 5))
+        },
+    })
+
+
+def _same(a, b):
+    for col in COLUMNS:
+        assert list(getattr(a, col)) == list(getattr(b, col)), col
+
+
+def test_cohort_matches_schedule():
+    pytest.importorskip("numpy")
+    from scheduler.bulk import schedule_cohort
+    rng  = random.Random(3)
+    reqs = [_random_request(rng) for _ in range(50)]
+    cohort = schedule_cohort(reqs)
+    for i, req in enumerate(reqs):
+        _same(cohort.timetable(i), schedule(req))
+
+
+@pytest.mark.parametrize("carry_over", [False, True])
+def test_incremental_edits_match_schedule(carry_over):
+    rng = random.Random(4)
+    for _ in range(50):
+        req = _random_request(rng, carry_over)
+        inc = IncrementalScheduler(req)
+        for _ in range(3):
+            ds = str(START + timedelta(days=rng.randrange(req.days_remaining)))
+            ev = rng.choice([None, FamilyEvent(rng.choice(["low", "high"]), rng.randint(1, 6))])
+            inc.set_family_event(ds, ev)
+        _same(inc.timetable(), schedule(inc.req))
+
+
+def test_incremental_update_replans_one_day_without_carry_over():
+    req = _random_request(random.Random(5))
+    inc = IncrementalScheduler(replace(req, family_events={}))
+    inc.days_replanned = 0
+    inc.update(replace(req, family_events={str(START): FamilyEvent("high", 4)}))
+    assert inc.days_replanned == 1
+
+
+@pytest.mark.parametrize("carry_over", [False, True])
+def test_day_chunks_match_schedule(carry_over):
+    rng = random.Random(6)
+    for _ in range(30):
+        req = _random_request(rng, carry_over)
+        whole = schedule(req)
+        rows  = [row for tt in iter_schedule(req, chunk_days=rng.randint(1, 10)) for row in tt.rows()]
+        assert rows == list(whole.rows())
+
+
+def test_codec_round_trip():
+    rng = random.Random(7)
+    for _ in range(30):
+        tt = schedule(_random_request(rng))
+        _same(decode(encode(tt)), tt)
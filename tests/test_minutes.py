@@ -0,0 +1,84 @@
+# ============================================================
+# tests/test_minutes.py — minute-level interval engine
+# ============================================================
+import random
+from datetime import date, timedelta
+
+from scheduler import ScheduleRequest
+from scheduler.core import family_by_day
+from scheduler.minutes import CHAPTER_MINUTES, MIN_BLOCK, day_segments, plan_day, schedule_minutes
+from scheduler.timetable import CAT_BREAK, CAT_STUDY, IntervalTimetable
+
+START = date(2026, 1, 5)
+COLUMNS = ("day", "hour", "category", "subject", "chapters", "start", "length", "counts")
+
+
+def _random_request(rng):
+    days = rng.randint(1, 60)
+    return ScheduleRequest.from_dict({
+        "subjects": {f"S{i}": rng.randint(0, 8) for i in range(rng.randint(1, 10))},
+        "days_remaining": days,
+        "max_daily_study": rng.randint(1, 8),
+        "attention_span": rng.choice([0.5, 1.0, 1.5, 2.0]),
+        "carry_over": rng.random() < 0.5,
+        "sleep_start": rng.choice([20, 21, 22, 23]),
+        "sleep_hours": rng.choice([8, 9, 9.5, 10]),
+        "start_date": START.isoformat(),
+        "family_events": {
+            str(START + timedelta(days=rng.randrange(days))):
+                {"impact": rng.choice(["low", "medium", "high"]), "hours": rng.randint(1, 6)}
+            for _ in range(rng.randint(0, 5))
+        },
+    })
+
+
+def _plan_every_day(req):
+    """schedule_minutes() without reusing repeated day plans."""
+    segments = day_segments(req.sleep_start, req.sleep_hours, req.routine)
+    fam      = family_by_day(req, req.start_date)
+    tt       = IntervalTimetable(req.start_date, tuple(s.name for s in req.subjects), fam)
+    state    = tuple(s.chapters_remaining * CHAPTER_MINUTES for s in req.subjects)
+    for d in range(req.days_remaining):
+        state = plan_day(req, d, fam.get(d), segments, state, tt.append_interval)
+    return tt
+
+
+def test_reused_day_plans_match_planning_every_day():
+    rng = random.Random(1)
+    for _ in range(400):
+        req = _random_request(rng)
+        got, want = schedule_minutes(req), _plan_every_day(req)
+        for col in COLUMNS:
+            assert getattr(got, col) == getattr(want, col), col
+
+
+def test_days_are_contiguous_and_capped():
+    rng = random.Random(2)
+    for _ in range(100):
+        req = _random_request(rng)
+        tt  = schedule_minutes(req)
+        study = {}
+        for i in range(len(tt)):
+            if i and tt.day[i] == tt.day[i - 1]:
+                assert tt.start[i] == tt.start[i - 1] + tt.length[i - 1]
+            if tt.category[i] == CAT_STUDY:
+                study[tt.day[i]] = study.get(tt.day[i], 0) + tt.length[i]
+        assert all(m <= req.max_daily_study * 60 for m in study.values())
+
+
+def test_block_continues_with_next_subject():
+    # one chapter each, 25-minute blocks: the block that finishes A
+    # (25 + 25 + 10 minutes) is topped up with B instead of ending early
+    req = ScheduleRequest.from_dict({
+        "subjects": {"A": 1, "B": 1}, "days_remaining": 1, "max_daily_study": 3,
+        "attention_span": 0.5, "start_date": START.isoformat()})
+    tt = schedule_minutes(req)
+    runs, cur = [], 0
+    for i in range(len(tt)):
+        if tt.category[i] == CAT_STUDY:
+            cur += tt.length[i]
+        elif cur:
+            runs.append((cur, tt.category[i]))
+            cur = 0
+    assert all(n >= MIN_BLOCK for n, after in runs if after == CAT_BREAK)
+    assert sum(tt.length[i] for i in range(len(tt)) if tt.category[i] == CAT_STUDY) == 120
@@ -0,0 +1,66 @@
+# ============================================================
+# tests/test_solver.py — balanced multi-day allocation
+# ============================================================
+import itertools
+import random
+from math import ceil
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from scheduler.solver import allocate
+
+
+def _targets(n, n_days):
+    return [(i + 0.5) * n_days / max(n, 1) - 0.5 for i in range(n)]
+
+
+def _cost(days, t):
+    """Total distance of chapters placed on `days` (in chapter order) to
+    their target days."""
+    return sum(abs(d - ti) for d, ti in zip(days, t))
+
+
+def test_small_instances_are_optimal():
+    # brute force over every assignment of the ordered chapters to days
+    rng = random.Random(0)
+    for _ in range(300):
+        n_days   = rng.randint(1, 5)
+        chapters = [rng.randint(0, 3) for _ in range(rng.randint(1, 3))]
+        caps     = [rng.randint(0, 2) for _ in range(n_days)]
+        n        = sum(chapters)
+        plan     = allocate(chapters, caps)
+
+        assert all(len(plan[d]) <= caps[d] for d in range(n_days))
+        assert sum(map(len, plan)) == min(n, sum(caps))
+        if n and n <= sum(caps):
+            t = _targets(n, n_days)
+            best = min(
+                _cost(combo, t)
+                for combo in itertools.product(range(n_days), repeat=n)
+                if all(combo.count(d) <= caps[d] for d in range(n_days))
+            )
+            placed = [d for d, subjects in enumerate(plan) for _ in subjects]
+            assert _cost(placed, t) <= best + 1e-6, (chapters, caps, plan)
+
+
+def test_daily_load_is_balanced():
+    # with caps that can hold ceil(n / D) every day, each day's load is
+    # within one chapter of the mean and nothing is dropped
+    rng = random.Random(0)
+    for _ in range(200):
+        chapters = [rng.randint(0, 20) for _ in range(rng.randint(1, 10))]
+        n_days   = rng.randint(1, 120)
+        n        = sum(chapters)
+        need     = ceil(n / n_days)
+        plan     = allocate(chapters, [rng.randint(need, need + 3) for _ in range(n_days)])
+
+        assert all(abs(len(p) - n / n_days) < 1 for p in plan), (chapters, n_days)
+        for si, c in enumerate(chapters):
+            assert sum(p.count(si) for p in plan) == c
+
+
+def test_subjects_interleave():
+    assert allocate([4, 4, 4], [4] * 14) == [
+        [0], [1], [2], [], [0], [1], [2], [0], [1], [2], [], [0], [1], [2]]
@@ -1,44 +1,323 @@
 # train_model.py
+#
+# python train_model.py                  RandomForest on synth.csv, all in memory
+# python train_model.py --stream --data big.csv --chunk 1000000 [--learner hgb|forest]
+# python train_model.py --sweep [--budget-ms 5] [--sweep-out sweep.csv]
+# python train_model.py --from-mongo [--stream ...]
+#
+# --stream never holds more than one chunk: CSV / Parquet (file or
+# directory) is read --chunk rows at a time with pinned dtypes and
+# categorical columns, and the model grows chunk by chunk:
+#   hgb     HistGradientBoostingRegressor, warm-started; each chunk adds
+#           --iters-per-chunk boosting iterations fitted on that chunk
+#   forest  RandomForestRegressor, warm-started; each chunk adds
+#           --trees-per-chunk trees fitted on that chunk (--compact works)
+# Wall time, peak RSS and MAE / RMSE on a validation sample held out
+# from the first chunk are printed after every chunk.
+#
+# --sweep fits a grid of forests (--sweep-trees x --sweep-depths) plus
+# ExtraTrees, HistGradientBoosting and Ridge on the same split and
+# tabulates, per candidate: fit time, model.joblib size, load time,
+# single-row and 10k-row predict latency (median, DataFrame input as
+# scheduler.ml passes it) and MAE / RMSE. Nothing is saved except the
+# table; retrain the pick with --n-estimators / --max-depth.
+#
+# --from-mongo trains on real outcomes instead of --data: study slots
+# the app logged (persistence.SlotLog) joined to the minutes reported
+# for them, read --chunk rows at a time from an aggregation cursor.
+# It combines with every mode above.
+import argparse
+import os
+from itertools import islice
+import sys
+import tempfile
+import time
+from math import sqrt
+
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.compose import ColumnTransformer
-from joblib import dump
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+from joblib import dump, load
 
-df = pd.read_csv("synth.csv")
+ap = argparse.ArgumentParser()
+ap.add_argument("--compact", nargs="?", const="model_compact", default=None, metavar="DIR",
+                help="also export a NumPy-only artifact (default dir: model_compact)")
+ap.add_argument("--data", default="synth.csv", help=".csv, .parquet or a directory of .parquet parts")
+ap.add_argument("--from-mongo", action="store_true",
+                help="train on logged slot outcomes (MONGODB_URI / DB_NAME) instead of --data")
+ap.add_argument("--stream", action="store_true", help="train chunk by chunk (out of core)")
+ap.add_argument("--chunk", type=int, default=1_000_000, help="rows per chunk with --stream")
+ap.add_argument("--learner", choices=["hgb", "forest"], default="hgb", help="model for --stream")
+ap.add_argument("--iters-per-chunk", type=int, default=40)
+ap.add_argument("--trees-per-chunk", type=int, default=10)
+ap.add_argument("--val-rows", type=int, default=20_000, help="held out from the first chunk")
+ap.add_argument("--n-estimators", type=int, default=150, help="trees for the in-memory forest")
+ap.add_argument("--max-depth", type=int, default=None, help="tree depth for the in-memory forest")
+ap.add_argument("--sweep", action="store_true", help="compare model sizes / latencies, save nothing")
+ap.add_argument("--sweep-trees", default="25,50,150", help="comma list of n_estimators")
+ap.add_argument("--sweep-depths", default="8,16,none", help="comma list of max_depth (none = unbounded)")
+ap.add_argument("--sweep-out", default="sweep_results.csv", help="comparison table (.csv or .md)")
+ap.add_argument("--budget-ms", type=float, default=None, help="single-row predict latency budget")
+args = ap.parse_args()
+if args.compact and args.stream and args.learner != "forest":
+    ap.error("--compact needs a RandomForest model (--learner forest)")
 
-# features / target
-X = df.drop(columns=["effective_minutes"])
-y = df["effective_minutes"]
+TARGET = "effective_minutes"
 
 # categorical / numeric
 cat_cols = ["subject","subj_difficulty"]
 num_cols = ["age","grade","sleep_hours","days_remaining","family_event","slot_hour","is_weekend","attention_span","chapters_remaining","urgency"]
 
-preprocessor = ColumnTransformer([
-    ("num", StandardScaler(), num_cols),
-    ("cat", OneHotEncoder(handle_unknown="ignore"), cat_cols)
-])
+# pinned dtypes for chunked reads: ~3x smaller than pandas' int64 / float64 / object defaults
+DTYPES = {
+    "age": "int16", "grade": "int16", "sleep_hours": "float32", "days_remaining": "int16",
+    "family_event": "int8", "slot_hour": "int8", "is_weekend": "int8", "attention_span": "float32",
+    "subject": "category", "subj_difficulty": "category", "chapters_remaining": "int16",
+    "urgency": "float32", TARGET: "float32",
+}
 
-model = Pipeline([
-    ("prep", preprocessor),
-    ("rf", RandomForestRegressor(n_estimators=150, random_state=42, n_jobs=-1))
-])
 
-X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.15, random_state=42)
-model.fit(X_train, y_train)
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:                     # Windows
+        return float("nan")
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
 
-# quick eval
-from sklearn.metrics import mean_absolute_error, mean_squared_error
-pred = model.predict(X_val)
-from math import sqrt
-print("MAE:", mean_absolute_error(y_val, pred))
-mse = mean_squared_error(y_val, pred)   # returns MSE
-print("RMSE:", sqrt(mse))
 
+def iter_outcomes(rows):
+    from persistence import SLOT_LOG, outcome_rows
+    from resources import get_mongo
+    it = outcome_rows(get_mongo().collection(SLOT_LOG), batch_size=min(rows, 10_000))
+    while chunk := list(islice(it, rows)):
+        yield pd.DataFrame(chunk, columns=list(DTYPES)).astype(DTYPES)
+
+
+def load_frame(path):
+    if args.from_mongo:
+        chunks = list(iter_outcomes(args.chunk))
+        if not chunks:
+            raise SystemExit("no reported slot outcomes in MongoDB yet")
+        return pd.concat(chunks, ignore_index=True)
+    return pd.read_csv(path) if path.endswith(".csv") else pd.read_parquet(path)
+
+
+def forest_prep(cats="auto"):
+    return ColumnTransformer([
+        ("num", StandardScaler(), num_cols),
+        ("cat", OneHotEncoder(categories=cats, handle_unknown="ignore"), cat_cols),
+    ])
+
+
+def hgb_prep(cats):
+    from sklearn.preprocessing import OrdinalEncoder
+    return ColumnTransformer([
+        ("num", "passthrough", num_cols),
+        ("cat", OrdinalEncoder(categories=cats, handle_unknown="use_encoded_value",
+                               unknown_value=np.nan), cat_cols),
+    ])
+
+
+HGB_CATS = list(range(len(num_cols), len(num_cols) + len(cat_cols)))
+
+
+def report(label, y_true, pred):
+    mae = mean_absolute_error(y_true, pred)
+    rmse = sqrt(mean_squared_error(y_true, pred))
+    print(f"{label}MAE: {mae:.4f}  RMSE: {rmse:.4f}")
+    return mae, rmse
+
+
+# ============================================================
+# IN MEMORY (original)
+# ============================================================
+def train_batch():
+    df = load_frame(args.data)
+
+    # features / target
+    X = df.drop(columns=[TARGET])
+    y = df[TARGET]
+
+    model = Pipeline([
+        ("prep", forest_prep()),
+        ("rf", RandomForestRegressor(n_estimators=args.n_estimators, max_depth=args.max_depth,
+                                     random_state=42, n_jobs=-1))
+    ])
+
+    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.15, random_state=42)
+    model.fit(X_train, y_train)
+
+    # quick eval
+    pred = model.predict(X_val)
+    print("MAE:", mean_absolute_error(y_val, pred))
+    mse = mean_squared_error(y_val, pred)   # returns MSE
+    print("RMSE:", sqrt(mse))
+    return model
+
+
+# ============================================================
+# STREAMING
+# ============================================================
+def iter_chunks(path, rows):
+    if args.from_mongo:
+        yield from iter_outcomes(rows)
+        return
+    if path.endswith(".csv"):
+        yield from pd.read_csv(path, dtype=DTYPES, chunksize=rows)
+        return
+    import pyarrow.dataset as ds
+    for batch in ds.dataset(path, format="parquet").to_batches(batch_size=rows):
+        yield batch.to_pandas().astype(DTYPES)
+
+
+def stream_model(first):
+    """Preprocessor + warm-start estimator; categories come from the first
+    chunk (plus generate_synth's lists), unseen ones are ignored later."""
+    from generate_synth import difficulties, subjects
+    cats = [sorted(set(first["subject"].astype(str)) | set(subjects)),
+            sorted(set(first["subj_difficulty"].astype(str)) | set(difficulties))]
+    if args.learner == "forest":
+        est = RandomForestRegressor(n_estimators=0, warm_start=True, min_samples_leaf=5,
+                                    random_state=42, n_jobs=-1)
+        return forest_prep(cats), "rf", est
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    est = HistGradientBoostingRegressor(
+        max_iter=0, warm_start=True, early_stopping=False, learning_rate=0.1,
+        categorical_features=HGB_CATS, random_state=42)
+    return hgb_prep(cats), "hgb", est
+
+
+def train_stream():
+    t0 = time.perf_counter()
+    prep = est = X_val = None
+    total = 0
+    for i, df in enumerate(iter_chunks(args.data, args.chunk)):
+        if prep is None:
+            prep, step, est = stream_model(df)
+            n_val = min(args.val_rows, len(df) // 5)
+            val, df = df.iloc[:n_val], df.iloc[n_val:]
+            prep.fit(df.drop(columns=[TARGET]))
+            X_val, y_val = prep.transform(val.drop(columns=[TARGET])), val[TARGET].to_numpy()
+        X = prep.transform(df.drop(columns=[TARGET]))
+        y = df[TARGET].to_numpy()
+        del df
+
+        tc = time.perf_counter()
+        if step == "rf":
+            est.n_estimators += args.trees_per_chunk
+        else:
+            est.max_iter += args.iters_per_chunk
+        est.fit(X, y)
+        total += len(y)
+        print(f"chunk {i}: {len(y):,} rows (total {total:,})  fit {time.perf_counter() - tc:.1f}s  "
+              f"wall {time.perf_counter() - t0:.1f}s  peak RSS {peak_rss_mb():.0f} MB  ", end="")
+        report("", y_val, est.predict(X_val))
+    if prep is None:
+        raise SystemExit("no rows in " + ("MongoDB slot outcomes" if args.from_mongo else args.data))
+    return Pipeline([("prep", prep), (step, est)])
+
+
+# ============================================================
+# SWEEP
+# ============================================================
+def sweep_candidates(cats):
+    from sklearn.ensemble import ExtraTreesRegressor, HistGradientBoostingRegressor
+    from sklearn.linear_model import Ridge
+    depths = [None if d.strip().lower() == "none" else int(d) for d in args.sweep_depths.split(",")]
+    for n in (int(t) for t in args.sweep_trees.split(",")):
+        for d in depths:
+            yield f"rf n={n} depth={d or '-'}", Pipeline([
+                ("prep", forest_prep(cats)),
+                ("rf", RandomForestRegressor(n_estimators=n, max_depth=d, random_state=42, n_jobs=-1))])
+    yield "extra n=50 depth=16", Pipeline([
+        ("prep", forest_prep(cats)),
+        ("et", ExtraTreesRegressor(n_estimators=50, max_depth=16, random_state=42, n_jobs=-1))])
+    yield "hgb iter=200", Pipeline([
+        ("prep", hgb_prep(cats)),
+        ("hgb", HistGradientBoostingRegressor(max_iter=200, categorical_features=HGB_CATS,
+                                              random_state=42))])
+    yield "ridge", Pipeline([("prep", forest_prep(cats)), ("ridge", Ridge())])
+
+
+def median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times)) * 1000
+
+
+def sweep():
+    df = load_frame(args.data)
+    X = df.drop(columns=[TARGET])
+    y = df[TARGET]
+    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.15, random_state=42)
+    cats = [sorted(X[c].astype(str).unique()) for c in cat_cols]
+    one = X_val.iloc[:1]
+    batch = X_val.sample(10_000, replace=len(X_val) < 10_000, random_state=0)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, model in sweep_candidates(cats):
+            t0 = time.perf_counter()
+            model.fit(X_train, y_train)
+            fit_s = time.perf_counter() - t0
+            path = os.path.join(tmp, "model.joblib")
+            dump(model, path)
+            load_ms = median_ms(lambda: load(path), 3)
+            model = load(path)          # time the object the app would hold
+            model.predict(one)          # first call pays lazy imports
+            pred = model.predict(X_val)
+            rows.append({
+                "model": name,
+                "fit_s": round(fit_s, 2),
+                "size_mb": round(os.path.getsize(path) / 2**20, 2),
+                "load_ms": round(load_ms, 1),
+                "predict_1_ms": round(median_ms(lambda: model.predict(one), 50), 2),
+                "predict_10k_ms": round(median_ms(lambda: model.predict(batch), 5), 1),
+                "mae": round(mean_absolute_error(y_val, pred), 4),
+                "rmse": round(sqrt(mean_squared_error(y_val, pred)), 4),
+            })
+            print(f"{name}: fit {fit_s:.2f}s  mae {rows[-1]['mae']}", flush=True)
+
+    table = pd.DataFrame(rows).sort_values("mae")
+    if args.budget_ms is not None:
+        table["in_budget"] = table["predict_1_ms"] <= args.budget_ms
+    print()
+    print(table.to_string(index=False))
+    if args.sweep_out.endswith(".md"):
+        cells = [list(table.columns)] + table.astype(str).values.tolist()
+        with open(args.sweep_out, "w", encoding="utf-8") as f:
+            f.write("| " + " | ".join(cells[0]) + " |\n")
+            f.write("|" + "---|" * len(cells[0]) + "\n")
+            f.writelines("| " + " | ".join(r) + " |\n" for r in cells[1:])
+    else:
+        table.to_csv(args.sweep_out, index=False)
+    print(f"\nSaved {args.sweep_out}")
+    if args.budget_ms is not None:
+        ok = table[table["in_budget"]]
+        print(f"Most accurate within {args.budget_ms} ms/row: "
+              + (ok.iloc[0]["model"] if len(ok) else "none"))
+
+
+if args.sweep:
+    sweep()
+    sys.exit()
+
+model = train_stream() if args.stream else train_batch()
 
 # save
 dump(model, "model.joblib")
 print("Saved model.joblib")
+
+# optional NumPy-only artifact: app / workers load it without sklearn
+if args.compact:
+    from scheduler.compact_model import export_compact
+    export_compact(model, args.compact)
+    print(f"Saved {args.compact}/")